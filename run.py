@@ -6,47 +6,167 @@
 Интерактивный режим работы
 """
 
+import json
+import os
 import yaml
 from pathlib import Path
 from datetime import datetime
+from typing import TYPE_CHECKING
 import logging
+import logging.handlers
 from rich.console import Console
-from rich.table import Table
+from rich.logging import RichHandler
 from rich.prompt import Prompt, Confirm
 
-from src.parser import InputFileParser
-from src.processor import DataProcessor
-from src.shipment_parser import ShipmentParser
-from src.shipment_processor import ShipmentProcessor
-from src.generators.invoice import InvoiceGenerator
-from src.generators.specification import SpecificationGenerator
-from src.generators.packing_list import PackingListGenerator
-from src.models import DocumentMetadata
-from src.km_loader import KMLoader
-from src.kiz_injector import KIZInjector
-
-# Настройка логирования
+from src.models import DocumentMetadata, line_totals
+
+if TYPE_CHECKING:
+    from src.km_loader import KMLoader
+
+# C-парсер YAML, если PyYAML собран с libyaml
+try:
+    from yaml import CSafeLoader as _YLoader
+except ImportError:
+    from yaml import SafeLoader as _YLoader
+
+console = Console()
+
+# Настройка логирования: полный лог в файл, в консоль - только предупреждения и ошибки
+# Файл пишется пачками через MemoryHandler (сбрасывается на WARNING и при выходе - logging.shutdown)
+file_handler = logging.FileHandler('automation.log', encoding='utf-8', delay=True)
+file_handler.setFormatter(logging.Formatter('%(asctime)s - %(levelname)s - %(message)s'))
+console_handler = RichHandler(console=console, level=logging.WARNING, show_path=False)
+console_handler.setFormatter(logging.Formatter('%(message)s'))
 logging.basicConfig(
     level=logging.INFO,
-    format='%(asctime)s - %(levelname)s - %(message)s',
     handlers=[
-        logging.FileHandler('automation.log', encoding='utf-8'),
-        logging.StreamHandler()
+        logging.handlers.MemoryHandler(2048, flushLevel=logging.WARNING, target=file_handler),
+        console_handler
     ]
 )
 logger = logging.getLogger(__name__)
 
-console = Console()
+
+def _scan_excel(dir_path) -> list:
+    """
+    Excel файлы папки за один проход os.scandir
+
+    Возвращает DirEntry (stat() кэшируется в записи), отсортированные по имени
+    """
+    entries = [
+        e for e in os.scandir(dir_path)
+        if e.name.lower().endswith(('.xlsx', '.xls'))
+        and not e.name.startswith('~')  # Исключаем временные файлы
+        and e.is_file()
+    ]
+    return sorted(entries, key=lambda e: e.name)
+
+
+def _files_table(entries, date_header: str = "Дата изменения"):
+    """Таблица Rich со списком файлов (DirEntry): номер, имя, размер, дата изменения"""
+    from rich.table import Table
+
+    fromtimestamp = datetime.fromtimestamp
+    date_fmt = '%d.%m.%Y %H:%M'
+    rows = []
+    for idx, entry in enumerate(entries, 1):
+        st = entry.stat()
+        rows.append((str(idx), entry.name, f"{st.st_size / 1024:.1f} KB", fromtimestamp(st.st_mtime).strftime(date_fmt)))
+
+    table = Table(show_header=True, header_style="bold magenta")
+    table.add_column("№", style="cyan", width=4)
+    table.add_column("Имя файла", style="green")
+    table.add_column("Размер", style="yellow", justify="right")
+    table.add_column(date_header, style="blue")
+    for row in rows:
+        table.add_row(*row)
+    return table
+
+
+def _ask_index(prompt: str, count: int) -> int:
+    """
+    Запрашивает номер от 1 до count и возвращает индекс (с нуля)
+
+    Ввод разбирается через int() и проверяется по диапазону, без списка
+    choices у Prompt.ask.
+    """
+    while True:
+        raw = Prompt.ask(prompt, default="1")
+        try:
+            idx = int(raw)
+        except ValueError:
+            idx = 0
+        if 1 <= idx <= count:
+            return idx - 1
+        console.print(f"[red]Неверный ввод: введите номер от 1 до {count}[/red]")
+
+
+_yaml_cache = {}
+
+
+def _load_yaml(path: Path):
+    """
+    Читает YAML файл с кэшем по (путь, mtime_ns)
+
+    Повторные выборы пресета в цикле main() не парсят неизмененный файл заново.
+    YAML в UTF-8: отдаем парсеру байты без текстовой обертки.
+    """
+    key = (str(path), path.stat().st_mtime_ns)
+    if key not in _yaml_cache:
+        _yaml_cache[key] = yaml.load(path.read_bytes(), Loader=_YLoader)
+    return _yaml_cache[key]
+
+
+def _preset_index_hit(cached, st) -> bool:
+    """
+    Запись индекса пресетов (.index.json) годна для файла с данным stat
+
+    Индекс - только кэш: запись чужой формы считается промахом, и YAML
+    перечитывается, а не теряется пресет.
+    """
+    return (
+        isinstance(cached, dict)
+        and isinstance(cached.get('name'), str)
+        and isinstance(cached.get('description'), str)
+        and cached.get('mtime_ns') == st.st_mtime_ns
+        and cached.get('size') == st.st_size
+    )
 
 
 class ShusteriAutomation:
     """Главный класс автоматизации"""
 
     def __init__(self, config_path: str = "config.yaml"):
-        with open(config_path, 'r', encoding='utf-8') as f:
-            self.config = yaml.safe_load(f)
+        self.config = _load_yaml(Path(config_path))
         
         self.preset = None  # Текущий выбранный пресет
+
+    @property
+    def preset(self):
+        return self._preset
+
+    @preset.setter
+    def preset(self, preset):
+        """Запоминает пресет и собирает из него шаблон метаданных документа"""
+        self._preset = preset
+        self._generators = {}
+        self._meta_template = None
+        if preset:
+            self._meta_template = DocumentMetadata(
+                invoice_number='',
+                date='',
+                seller_name=preset['seller']['name'],
+                seller_name_en=preset['seller'].get('name_en', ''),
+                seller_address=preset['seller']['address'],
+                seller_address_en=preset['seller'].get('address_en', ''),
+                buyer_name=preset['buyer']['name'],
+                buyer_address=preset['buyer']['address'],
+                buyer_address_en=preset['buyer'].get('address_en', ''),
+                contract_number=preset['contract']['number'],
+                contract_date=preset['contract']['date'],
+                terms_of_delivery=preset['delivery']['terms'],
+                currency=preset['delivery']['currency']
+            )
     
     def get_available_presets(self):
         """Получает список доступных пресетов"""
@@ -57,36 +177,79 @@ class ShusteriAutomation:
             return []
         
         # Ищем YAML файлы
-        preset_files = list(presets_dir.glob("*.yaml")) + list(presets_dir.glob("*.yml"))
+        preset_files = [
+            e for e in os.scandir(presets_dir)
+            if e.name.lower().endswith(('.yaml', '.yml')) and e.is_file()
+        ]
         
         if not preset_files:
             console.print("[bold red]❌ Нет пресетов в папке presets/![/bold red]")
             return []
         
-        # Загружаем информацию о пресетах
+        # Индекс name/description по (mtime, size), чтобы не парсить все YAML при каждом запуске
+        index_file = presets_dir / ".index.json"
+        try:
+            index = json.loads(index_file.read_text(encoding='utf-8'))
+        except (OSError, ValueError):
+            index = {}
+        if not isinstance(index, dict):
+            index = {}
+
         presets = []
-        for preset_file in sorted(preset_files):
+        new_index = {}
+        for entry in sorted(preset_files, key=lambda e: e.name):
+            preset_file = Path(entry.path)
             try:
-                with open(preset_file, 'r', encoding='utf-8') as f:
-                    preset_data = yaml.safe_load(f)
-                    presets.append({
-                        'file': preset_file,
+                st = entry.stat()
+            except OSError as e:
+                logger.warning(f"Не удалось загрузить пресет {preset_file}: {e}")
+                continue
+            cached = index.get(preset_file.name)
+            if not _preset_index_hit(cached, st):
+                try:
+                    preset_data = self._load_preset(preset_file)
+                    cached = {
+                        'mtime_ns': st.st_mtime_ns,
+                        'size': st.st_size,
                         'name': preset_data.get('preset_name', preset_file.stem),
                         'description': preset_data.get('description', ''),
-                        'data': preset_data
-                    })
-            except Exception as e:
-                logger.warning(f"Не удалось загрузить пресет {preset_file}: {e}")
-        
+                    }
+                except Exception as e:
+                    logger.warning(f"Не удалось загрузить пресет {preset_file}: {e}")
+                    continue
+            new_index[preset_file.name] = cached
+            presets.append({
+                'file': preset_file,
+                'name': cached['name'],
+                'description': cached['description'],
+            })
+
+        if new_index != index:
+            try:
+                index_file.write_text(json.dumps(new_index, ensure_ascii=False, indent=2), encoding='utf-8')
+            except OSError as e:
+                logger.warning(f"Не удалось сохранить индекс пресетов: {e}")
+
         return presets
+
+    def _load_preset(self, preset_file: Path) -> dict:
+        """Загружает полные данные пресета"""
+        return _load_yaml(preset_file)
     
     def select_preset(self):
         """Интерактивный выбор пресета"""
+        from rich.table import Table
+
         presets = self.get_available_presets()
         
         if not presets:
             return None
         
+        # Единственный пресет выбираем сразу, без таблицы
+        if len(presets) == 1:
+            console.print(f"[green]✓ Автоматически выбран пресет: {presets[0]['name']}[/green]\n")
+            return self._load_preset(presets[0]['file'])
+
         # Показываем список пресетов
         console.print("\n[bold cyan]👥 Доступные пресеты клиентов:[/bold cyan]\n")
         
@@ -106,18 +269,10 @@ class ShusteriAutomation:
         console.print()
         
         # Запрашиваем выбор
-        if len(presets) == 1:
-            console.print(f"[green]✓ Автоматически выбран пресет: {presets[0]['name']}[/green]\n")
-            return presets[0]['data']
-        else:
-            choice = Prompt.ask(
-                "Выберите пресет (введите номер)",
-                choices=[str(i) for i in range(1, len(presets) + 1)],
-                default="1"
-            )
-            selected_preset = presets[int(choice) - 1]
-            console.print(f"[green]✓ Выбран пресет: {selected_preset['name']}[/green]\n")
-            return selected_preset['data']
+        idx = _ask_index("Выберите пресет (введите номер)", len(presets))
+        selected_preset = presets[idx]
+        console.print(f"[green]✓ Выбран пресет: {selected_preset['name']}[/green]\n")
+        return self._load_preset(selected_preset['file'])
 
     def get_input_files(self):
         """Получает список файлов в папке input/"""
@@ -127,11 +282,7 @@ class ShusteriAutomation:
             console.print("[yellow]Создайте папку input/ и положите туда Excel файлы[/yellow]")
             return []
         
-        # Ищем Excel файлы
-        excel_files = list(input_dir.glob("*.xlsx")) + list(input_dir.glob("*.xls"))
-        excel_files = [f for f in excel_files if not f.name.startswith('~')]  # Исключаем временные файлы
-        
-        return sorted(excel_files)
+        return _scan_excel(input_dir)
 
     def select_input_file(self):
         """Интерактивный выбор входного файла"""
@@ -142,38 +293,22 @@ class ShusteriAutomation:
             console.print("[yellow]Положите Excel файл в папку input/ и запустите программу снова[/yellow]")
             return None
         
+        if len(files) == 1:
+            # Если файл один - используем его автоматически
+            console.print(f"[green]✓ Автоматически выбран файл: {files[0].name}[/green]\n")
+            return Path(files[0].path)
+
         # Показываем список файлов
         console.print("\n[bold cyan]📁 Доступные файлы:[/bold cyan]\n")
         
-        table = Table(show_header=True, header_style="bold magenta")
-        table.add_column("№", style="cyan", width=4)
-        table.add_column("Имя файла", style="green")
-        table.add_column("Размер", style="yellow", justify="right")
-        table.add_column("Дата изменения", style="blue")
-        
-        for idx, file in enumerate(files, 1):
-            size_kb = file.stat().st_size / 1024
-            mtime = datetime.fromtimestamp(file.stat().st_mtime).strftime('%d.%m.%Y %H:%M')
-            table.add_row(str(idx), file.name, f"{size_kb:.1f} KB", mtime)
-        
-        console.print(table)
+        console.print(_files_table(files))
         console.print()
         
-        # Запрашиваем выбор
-        if len(files) == 1:
-            # Если файл один - используем его автоматически
-            console.print(f"[green]✓ Автоматически выбран файл: {files[0].name}[/green]\n")
-            return files[0]
-        else:
-            # Если файлов несколько - даем выбрать
-            choice = Prompt.ask(
-                "Выберите файл (введите номер)",
-                choices=[str(i) for i in range(1, len(files) + 1)],
-                default="1"
-            )
-            selected_file = files[int(choice) - 1]
-            console.print(f"[green]✓ Выбран файл: {selected_file.name}[/green]\n")
-            return selected_file
+        # Если файлов несколько - даем выбрать
+        idx = _ask_index("Выберите файл (введите номер)", len(files))
+        selected_file = files[idx]
+        console.print(f"[green]✓ Выбран файл: {selected_file.name}[/green]\n")
+        return Path(selected_file.path)
 
     def get_km_files(self):
         """Получает список файлов в папке выгрузка честный знак/"""
@@ -181,11 +316,7 @@ class ShusteriAutomation:
         if not km_dir.exists():
             return []
 
-        # Ищем Excel файлы
-        excel_files = list(km_dir.glob("*.xlsx")) + list(km_dir.glob("*.xls"))
-        excel_files = [f for f in excel_files if not f.name.startswith('~')]  # Исключаем временные файлы
-
-        return sorted(excel_files)
+        return _scan_excel(km_dir)
 
     def select_km_file(self):
         """Интерактивный выбор файла маркировки (КМ)"""
@@ -205,45 +336,28 @@ class ShusteriAutomation:
             console.print("[yellow]   Продолжаем без маркировки[/yellow]\n")
             return None
 
+        if len(files) == 1:
+            console.print(f"[green]✓ Автоматически выбран файл: {files[0].name}[/green]\n")
+            return Path(files[0].path)
+
         # Показываем список файлов
         console.print("\n[bold cyan]📁 Доступные файлы маркировки:[/bold cyan]\n")
 
-        table = Table(show_header=True, header_style="bold magenta")
-        table.add_column("№", style="cyan", width=4)
-        table.add_column("Имя файла", style="green")
-        table.add_column("Размер", style="yellow", justify="right")
-        table.add_column("Дата изменения", style="blue")
-
-        for idx, file in enumerate(files, 1):
-            size_kb = file.stat().st_size / 1024
-            mtime = datetime.fromtimestamp(file.stat().st_mtime).strftime('%d.%m.%Y %H:%M')
-            table.add_row(str(idx), file.name, f"{size_kb:.1f} KB", mtime)
-
-        console.print(table)
+        console.print(_files_table(files))
         console.print()
 
         # Запрашиваем выбор
-        if len(files) == 1:
-            console.print(f"[green]✓ Автоматически выбран файл: {files[0].name}[/green]\n")
-            return files[0]
-        else:
-            choice = Prompt.ask(
-                "Выберите файл (введите номер)",
-                choices=[str(i) for i in range(1, len(files) + 1)],
-                default="1"
-            )
-            selected_file = files[int(choice) - 1]
-            console.print(f"[green]✓ Выбран файл: {selected_file.name}[/green]\n")
-            return selected_file
+        idx = _ask_index("Выберите файл (введите номер)", len(files))
+        selected_file = files[idx]
+        console.print(f"[green]✓ Выбран файл: {selected_file.name}[/green]\n")
+        return Path(selected_file.path)
 
     def get_output_files(self):
         """Получает список xlsx файлов из папки output/"""
         output_dir = Path("output")
         if not output_dir.exists():
             return []
-        files = list(output_dir.glob("*.xlsx")) + list(output_dir.glob("*.xls"))
-        files = [f for f in files if not f.name.startswith("~")]
-        return sorted(files, key=lambda f: f.stat().st_mtime, reverse=True)
+        return sorted(_scan_excel(output_dir), key=lambda e: e.stat().st_mtime, reverse=True)
 
     def select_output_file(self):
         """Интерактивный выбор файла из папки output/"""
@@ -254,37 +368,26 @@ class ShusteriAutomation:
             console.print("[yellow]Сначала создайте документы в основном режиме[/yellow]")
             return None
 
-        console.print("\n[bold cyan]📁 Файлы в папке output/:[/bold cyan]\n")
-
-        table = Table(show_header=True, header_style="bold magenta")
-        table.add_column("№",  style="cyan", width=4)
-        table.add_column("Имя файла", style="green")
-        table.add_column("Размер",    style="yellow", justify="right")
-        table.add_column("Изменён",   style="blue")
+        if len(files) == 1:
+            console.print(f"[green]✓ Автоматически выбран файл: {files[0].name}[/green]\n")
+            return Path(files[0].path)
 
-        for idx, file in enumerate(files, 1):
-            size_kb = file.stat().st_size / 1024
-            mtime   = datetime.fromtimestamp(file.stat().st_mtime).strftime("%d.%m.%Y %H:%M")
-            table.add_row(str(idx), file.name, f"{size_kb:.1f} KB", mtime)
+        console.print("\n[bold cyan]📁 Файлы в папке output/:[/bold cyan]\n")
 
-        console.print(table)
+        console.print(_files_table(files, date_header="Изменён"))
         console.print()
 
-        if len(files) == 1:
-            console.print(f"[green]✓ Автоматически выбран файл: {files[0].name}[/green]\n")
-            return files[0]
-
-        choice = Prompt.ask(
-            "Выберите файл (введите номер)",
-            choices=[str(i) for i in range(1, len(files) + 1)],
-            default="1"
-        )
-        selected = files[int(choice) - 1]
+        idx = _ask_index("Выберите файл (введите номер)", len(files))
+        selected = files[idx]
         console.print(f"[green]✓ Выбран файл: {selected.name}[/green]\n")
-        return selected
+        return Path(selected.path)
 
     def inject_kiz_flow(self):
         """Полный флоу: добавить КИЗ коды в уже готовый файл Спецификации"""
+        from rich.table import Table
+        from src.km_loader import KMLoader
+        from src.kiz_injector import KIZInjector
+
         console.print("\n[bold cyan]🏷️  Добавление КИЗ кодов в существующий файл[/bold cyan]\n")
 
         # 1. Выбор целевого файла
@@ -298,31 +401,16 @@ class ShusteriAutomation:
             console.print("[bold red]❌ Нет файлов маркировки в папке 'выгрузка честный знак/'[/bold red]")
             return
 
-        console.print("\n[bold cyan]📁 Доступные файлы маркировки:[/bold cyan]\n")
-        table = Table(show_header=True, header_style="bold magenta")
-        table.add_column("№",  style="cyan", width=4)
-        table.add_column("Имя файла", style="green")
-        table.add_column("Размер",    style="yellow", justify="right")
-        table.add_column("Изменён",   style="blue")
-
-        for idx, file in enumerate(km_files, 1):
-            size_kb = file.stat().st_size / 1024
-            mtime   = datetime.fromtimestamp(file.stat().st_mtime).strftime("%d.%m.%Y %H:%M")
-            table.add_row(str(idx), file.name, f"{size_kb:.1f} KB", mtime)
-
-        console.print(table)
-        console.print()
-
         if len(km_files) == 1:
-            km_file = km_files[0]
+            km_file = Path(km_files[0].path)
             console.print(f"[green]✓ Автоматически выбран файл: {km_file.name}[/green]\n")
         else:
-            choice = Prompt.ask(
-                "Выберите файл маркировки (введите номер)",
-                choices=[str(i) for i in range(1, len(km_files) + 1)],
-                default="1"
-            )
-            km_file = km_files[int(choice) - 1]
+            console.print("\n[bold cyan]📁 Доступные файлы маркировки:[/bold cyan]\n")
+            console.print(_files_table(km_files, date_header="Изменён"))
+            console.print()
+
+            idx = _ask_index("Выберите файл маркировки (введите номер)", len(km_files))
+            km_file = Path(km_files[idx].path)
             console.print(f"[green]✓ Выбран файл: {km_file.name}[/green]\n")
 
         # 3. Перезаписать или сохранить как новый файл?
@@ -371,7 +459,7 @@ class ShusteriAutomation:
         console.print(result_table)
         console.print(f"\n[bold cyan]📁 Файл сохранён: {output_file.absolute()}[/bold cyan]\n")
 
-    def enrich_with_km_codes(self, output_lines, km_loader: KMLoader):
+    def enrich_with_km_codes(self, output_lines, km_loader: "KMLoader"):
         """
         Обогащает output_lines кодами маркировки из справочника КМ.
 
@@ -386,6 +474,7 @@ class ShusteriAutomation:
         """
         enriched_count = 0
         total_km_codes = 0
+        get_km_codes = km_loader.get_km_codes_exact
 
         for line in output_lines:
             # Проверяем, есть ли информация о размерах
@@ -394,7 +483,7 @@ class ShusteriAutomation:
                 continue
 
             # Получаем ТОЧНОЕ количество КМ кодов для конкретных размеров
-            km_codes = km_loader.get_km_codes_exact(line.article, line.qty_by_size)
+            km_codes = get_km_codes(line.article, line.qty_by_size)
 
             if km_codes:
                 line.kiz_codes = km_codes
@@ -467,6 +556,20 @@ class ShusteriAutomation:
 
         return choice
     
+    def _get_generators(self, mode: str):
+        """Генераторы Invoice, Specification и Packing List для текущего пресета (создаются один раз на режим)"""
+        if mode not in self._generators:
+            from src.generators.invoice import InvoiceGenerator
+            from src.generators.specification import SpecificationGenerator
+            from src.generators.packing_list import PackingListGenerator
+
+            self._generators[mode] = (
+                InvoiceGenerator(self.config, self.preset, mode=mode),
+                SpecificationGenerator(self.config, self.preset, mode=mode),
+                PackingListGenerator(self.config, self.preset, mode=mode),
+            )
+        return self._generators[mode]
+
     def generate_combined_file(
             self,
             output_lines,
@@ -476,91 +579,24 @@ class ShusteriAutomation:
             mode: str = 'container'
     ):
         """Генерирует один файл с тремя листами"""
-        from openpyxl import Workbook, load_workbook
-        import tempfile
-        import os
+        from openpyxl import Workbook
+        from src.generators import build_row_plan
 
         combined_file = output_path / f"{base_name}_All_Documents.xlsx"
 
-        # Создаем временные файлы для каждого документа
-        with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmpdir:
-            temp_invoice = os.path.join(tmpdir, "invoice.xlsx")
-            temp_spec = os.path.join(tmpdir, "spec.xlsx")
-            temp_packing = os.path.join(tmpdir, "packing.xlsx")
+        # Каждый генератор заполняет свой лист прямо в общей книге
+        wb = Workbook()
+        wb.remove(wb.active)
 
-            # Генерируем каждый документ во временные файлы
-            invoice_gen = InvoiceGenerator(self.config, self.preset, mode=mode)
-            invoice_gen.generate(output_lines, metadata, temp_invoice)
+        plan = build_row_plan(output_lines)
+        for generator in self._get_generators(mode):
+            ws = wb.create_sheet(generator.sheet_name)
+            generator.populate_sheet(ws, output_lines, metadata, plan)
 
-            spec_gen = SpecificationGenerator(self.config, self.preset, mode=mode)
-            spec_gen.generate(output_lines, metadata, temp_spec)
+        wb.save(combined_file)
+        wb.close()
 
-            packing_gen = PackingListGenerator(self.config, self.preset, mode=mode)
-            packing_gen.generate(output_lines, metadata, temp_packing)
-            
-            # Создаем новый workbook для объединения
-            wb_combined = Workbook()
-            wb_combined.remove(wb_combined.active)  # Удаляем дефолтный лист
-            
-            # Копируем лист Invoice
-            wb_invoice = load_workbook(temp_invoice)
-            ws_invoice = wb_invoice.active
-            ws_new_invoice = wb_combined.create_sheet("Invoice")
-            self._copy_sheet(ws_invoice, ws_new_invoice)
-            wb_invoice.close()
-            
-            # Копируем лист Specification
-            wb_spec = load_workbook(temp_spec)
-            ws_spec = wb_spec.active
-            ws_new_spec = wb_combined.create_sheet("Specification")
-            self._copy_sheet(ws_spec, ws_new_spec)
-            wb_spec.close()
-            
-            # Копируем лист Packing List
-            wb_packing = load_workbook(temp_packing)
-            ws_packing = wb_packing.active
-            ws_new_packing = wb_combined.create_sheet("Packing List")
-            self._copy_sheet(ws_packing, ws_new_packing)
-            wb_packing.close()
-            
-            # Сохраняем объединенный файл
-            wb_combined.save(str(combined_file))
-            wb_combined.close()
-        
         return combined_file
-    
-    def _copy_sheet(self, source_ws, target_ws):
-        """Копирует содержимое и форматирование из одного листа в другой"""
-        from copy import copy
-        
-        # Копируем размеры колонок
-        for column in source_ws.column_dimensions:
-            target_ws.column_dimensions[column].width = source_ws.column_dimensions[column].width
-        
-        # Копируем размеры строк
-        for row in source_ws.row_dimensions:
-            target_ws.row_dimensions[row].height = source_ws.row_dimensions[row].height
-        
-        # Копируем ячейки
-        for row in source_ws.iter_rows():
-            for cell in row:
-                target_cell = target_ws[cell.coordinate]
-                
-                # Копируем значение
-                target_cell.value = cell.value
-                
-                # Копируем форматирование
-                if cell.has_style:
-                    target_cell.font = copy(cell.font)
-                    target_cell.border = copy(cell.border)
-                    target_cell.fill = copy(cell.fill)
-                    target_cell.number_format = copy(cell.number_format)
-                    target_cell.protection = copy(cell.protection)
-                    target_cell.alignment = copy(cell.alignment)
-        
-        # Копируем объединенные ячейки
-        for merged_cell_range in source_ws.merged_cells.ranges:
-            target_ws.merge_cells(str(merged_cell_range))
 
     def process(
             self,
@@ -573,6 +609,7 @@ class ShusteriAutomation:
             km_file: Path = None
     ):
         """Главный метод обработки"""
+        from rich.table import Table
 
         console.print(f"\n[bold blue]🚀 Начало обработки Invoice #{invoice_number}[/bold blue]\n")
 
@@ -582,6 +619,9 @@ class ShusteriAutomation:
 
             if mode == 'container':
                 # Старый формат: загрузка контейнера
+                from src.parser import InputFileParser
+                from src.processor import DataProcessor
+
                 parser = InputFileParser(self.config)
                 products = parser.parse(str(input_file))
 
@@ -598,6 +638,9 @@ class ShusteriAutomation:
 
             else:
                 # Новый формат: отправка грузов (полупары)
+                from src.shipment_parser import ShipmentParser
+                from src.shipment_processor import ShipmentProcessor
+
                 parser = ShipmentParser(str(input_file))
                 shipment_lines = parser.parse()
 
@@ -618,6 +661,7 @@ class ShusteriAutomation:
             if km_file:
                 console.print("[cyan]🏷️  Загрузка кодов маркировки...[/cyan]")
                 try:
+                    from src.km_loader import KMLoader
                     km_loader = KMLoader(str(km_file))
                     enriched_count, total_km = self.enrich_with_km_codes(output_lines, km_loader)
                     console.print(f"[green]✓ Добавлено {total_km} КМ кодов в {enriched_count} строк[/green]\n")
@@ -627,30 +671,20 @@ class ShusteriAutomation:
                     console.print("[yellow]   Продолжаем без маркировки[/yellow]\n")
 
             # 3. Подготовка метаданных
-            date = datetime.now().strftime('%d.%m.%Y')
-            metadata = DocumentMetadata(
-                invoice_number=invoice_number,
-                date=date,
-                container_number=container_number,
-                seller_name=self.preset['seller']['name'],
-                seller_name_en=self.preset['seller'].get('name_en', ''),
-                seller_address=self.preset['seller']['address'],
-                seller_address_en=self.preset['seller'].get('address_en', ''),
-                buyer_name=self.preset['buyer']['name'],
-                buyer_address=self.preset['buyer']['address'],
-                buyer_address_en=self.preset['buyer'].get('address_en', ''),
-                contract_number=self.preset['contract']['number'],
-                contract_date=self.preset['contract']['date'],
-                terms_of_delivery=self.preset['delivery']['terms'],
-                currency=self.preset['delivery']['currency']
-            )
+            now = datetime.now()
+            date = now.strftime('%d.%m.%Y')
+            metadata = self._meta_template.model_copy(update={
+                'invoice_number': invoice_number,
+                'date': date,
+                'container_number': container_number,
+            })
 
             # 4. Создание директории для выходных файлов
             output_path = Path(output_dir)
             output_path.mkdir(exist_ok=True)
 
             # Имена файлов
-            base_name = f"Shusteri_{invoice_number}_{datetime.now().strftime('%Y%m%d')}"
+            base_name = f"Shusteri_{invoice_number}_{now.strftime('%Y%m%d')}"
 
             # 5. Генерация документов с форматированием
             console.print("[cyan]📄 Генерация документов с форматированием...[/cyan]")
@@ -661,15 +695,16 @@ class ShusteriAutomation:
                 spec_file = output_path / f"{base_name}_Specification.xlsx"
                 packing_file = output_path / f"{base_name}_PackingList.xlsx"
 
-                invoice_gen = InvoiceGenerator(self.config, self.preset, mode=mode)
-                invoice_gen.generate(output_lines, metadata, str(invoice_file))
+                from src.generators import generate_all
 
-                spec_gen = SpecificationGenerator(self.config, self.preset, mode=mode)
-                spec_gen.generate(output_lines, metadata, str(spec_file))
+                invoice_gen, spec_gen, packing_gen = self._get_generators(mode)
+
+                # Документы независимы (у каждого своя книга) - сохраняем параллельно
+                generate_all(
+                    [(invoice_gen, invoice_file), (spec_gen, spec_file), (packing_gen, packing_file)],
+                    output_lines, metadata
+                )
 
-                packing_gen = PackingListGenerator(self.config, self.preset, mode=mode)
-                packing_gen.generate(output_lines, metadata, str(packing_file))
-                
                 generated_files = [
                     ("Invoice", invoice_file.name),
                     ("Specification", spec_file.name),
@@ -704,10 +739,7 @@ class ShusteriAutomation:
             console.print(result_table)
 
             # Статистика
-            total_qty = sum(line.quantity for line in output_lines)
-            total_amount = sum(line.amount for line in output_lines)
-            total_net = sum(line.net_weight for line in output_lines)
-            total_gross = sum(line.gross_weight for line in output_lines)
+            total_qty, total_amount, total_net, total_gross = line_totals(output_lines)
 
             stats_table = Table(title="Статистика")
             stats_table.add_column("Параметр", style="cyan")
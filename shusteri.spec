@@ -27,6 +27,7 @@ hidden_imports = [
     "openpyxl.styles.borders",
     "openpyxl.styles.alignment",
     "openpyxl.utils",
+    "lxml.etree",  # openpyxl пишет XML через lxml, если он установлен
     "pandas",
     "xlsxwriter",
     # Стандартные модули которые PyInstaller может не найти
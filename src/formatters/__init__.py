@@ -1,8 +1,9 @@
 """
 Модуль форматирования документов
 """
+from .base import BaseFormatter
 from .invoice_formatter import InvoiceFormatter
 from .specification_formatter import SpecificationFormatter
 from .packing_list_formatter import PackingListFormatter
 
-__all__ = ['InvoiceFormatter', 'SpecificationFormatter', 'PackingListFormatter']
+__all__ = ['BaseFormatter', 'InvoiceFormatter', 'SpecificationFormatter', 'PackingListFormatter']
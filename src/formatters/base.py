@@ -0,0 +1,156 @@
+"""
+Базовый класс форматтеров документов
+"""
+from openpyxl import Workbook, load_workbook
+
+from .styles import register_table_styles
+
+
+class BaseFormatter:
+    """
+    Общий порядок форматирования: ширина колонок, шапка, таблица, футер
+
+    Подклассы описывают документ атрибутами класса ниже; шаги, которые
+    не укладываются в описание (заливка, подписи), переопределяются.
+    """
+
+    __slots__ = ('config',)
+
+    # Ширина колонок: {буква: ширина}
+    COLUMN_WIDTHS = {}
+    # Шапка: (объединяемый диапазон, шрифт, выравнивание) для первой ячейки
+    HEADER_CELLS = ()
+    # Высота строк шапки: {номер строки: высота}
+    HEADER_ROW_HEIGHTS = {}
+    # Строка заголовка таблицы, её высота и именованный стиль (см. styles.TABLE_STYLES)
+    TABLE_HEADER_ROW = 0
+    TABLE_HEADER_HEIGHT = None
+    TABLE_HEADER_STYLE = 'table_header'
+    # Именованные стили строк данных и строки Total по колонкам (задают ширину таблицы)
+    DATA_STYLES = ()
+    TOTAL_STYLES = ()
+    # Высота строк данных (None — по умолчанию Excel)
+    DATA_ROW_HEIGHT = None
+    # Информационные строки после Total: количество, шрифт, выравнивание
+    # и смещение строки "Payment of the cost..." (None — нет такой строки)
+    FOOTER_INFO_ROWS = 0
+    FOOTER_FONT = None
+    FOOTER_ALIGNMENT = None
+    FOOTER_PAYMENT_ROW = None
+
+    def __init__(self, config: dict):
+        self.config = config
+
+    def format(self, wb_or_path, data_start_row: int, data_end_row: int):
+        """
+        Применяет форматирование к файлу или к открытой книге
+
+        Открытая книга форматируется в памяти (без загрузки и сохранения),
+        файл загружается, форматируется и сохраняется на место.
+
+        Args:
+            wb_or_path: книга openpyxl (Workbook) или путь к файлу Excel
+            data_start_row: номер строки, где начинаются данные таблицы (после заголовка)
+            data_end_row: номер последней строки с данными (перед Total)
+        """
+        if isinstance(wb_or_path, Workbook):
+            self.format_sheet(wb_or_path.active, data_start_row, data_end_row)
+            return
+
+        file_path = wb_or_path
+        # Книга изменяется, поэтому не read_only; макросы, внешние связи и
+        # кэш значений формул форматтеру не нужны
+        wb = load_workbook(file_path, keep_vba=False, data_only=False, keep_links=False)
+        ws = wb.active
+
+        self.format_sheet(ws, data_start_row, data_end_row)
+
+        # Сохранение
+        wb.save(file_path)
+        wb.close()  # ВАЖНО: Закрываем файл чтобы Windows мог его удалить
+
+    def format_sheet(self, ws, data_start_row: int, data_end_row: int):
+        """
+        Применяет форматирование к листу в памяти
+
+        Args:
+            ws: лист openpyxl
+            data_start_row: номер строки, где начинаются данные таблицы (после заголовка)
+            data_end_row: номер последней строки с данными (перед Total)
+        """
+        # Настройка ширины колонок
+        self._set_column_widths(ws)
+
+        # Форматирование шапки документа
+        self._format_header(ws)
+
+        # Форматирование таблицы
+        self._format_table(ws, data_start_row, data_end_row)
+
+        # Форматирование футера
+        self._format_footer(ws, data_end_row)
+
+    def _set_column_widths(self, ws):
+        """Устанавливает ширину колонок"""
+        column_dimensions = ws.column_dimensions
+        for col, width in self.COLUMN_WIDTHS.items():
+            column_dimensions[col].width = width
+
+    def _format_header(self, ws):
+        """Форматирует шапку документа"""
+        for cell_range, font, alignment in self.HEADER_CELLS:
+            ws.merge_cells(cell_range)
+            cell = ws[cell_range.split(':')[0]]
+            cell.font = font
+            cell.alignment = alignment
+
+        for row, height in self.HEADER_ROW_HEIGHTS.items():
+            ws.row_dimensions[row].height = height
+
+    def _format_table(self, ws, data_start_row, data_end_row):
+        """Форматирует таблицу с данными"""
+        register_table_styles(ws.parent)
+        max_col = len(self.DATA_STYLES)
+
+        # Заголовок таблицы
+        header_row = self.TABLE_HEADER_ROW
+        ws.row_dimensions[header_row].height = self.TABLE_HEADER_HEIGHT
+
+        for row_cells in ws.iter_rows(min_row=header_row, max_row=header_row, max_col=max_col):
+            for cell in row_cells:
+                cell.style = self.TABLE_HEADER_STYLE
+
+        # Таблица без позиций: остаются только заголовок и строка Total
+        if data_end_row < data_start_row:
+            return
+
+        # Форматирование строк данных
+        data_styles = self.DATA_STYLES
+        data_row_height = self.DATA_ROW_HEIGHT
+        for row_cells in ws.iter_rows(min_row=data_start_row, max_row=data_end_row, max_col=max_col):
+            if data_row_height is not None:
+                ws.row_dimensions[row_cells[0].row].height = data_row_height
+            for cell, style in zip(row_cells, data_styles):
+                cell.style = style
+
+    def _format_footer(self, ws, data_end_row):
+        """Форматирует строку Total и информационные строки после таблицы"""
+        total_row = data_end_row + 1
+        max_col = len(self.TOTAL_STYLES)
+
+        # Строка Total
+        for row_cells in ws.iter_rows(min_row=total_row, max_row=total_row, max_col=max_col):
+            for cell, style in zip(row_cells, self.TOTAL_STYLES):
+                cell.style = style
+
+        # Информационные строки: каждая объединена на всю ширину таблицы
+        info_start = total_row + 1
+        for row_offset in range(self.FOOTER_INFO_ROWS):
+            row = info_start + row_offset
+            ws.merge_cells(start_row=row, start_column=1, end_row=row, end_column=max_col)
+            cell = ws.cell(row=row, column=1)
+            cell.font = self.FOOTER_FONT
+            cell.alignment = self.FOOTER_ALIGNMENT
+            # Строка "Payment of the cost..." выше остальных
+            if row_offset == self.FOOTER_PAYMENT_ROW:
+                ws.row_dimensions[row].height = 45
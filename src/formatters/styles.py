@@ -0,0 +1,65 @@
+"""
+Общие объекты стилей для форматтеров
+
+Стили openpyxl неизменяемы по смыслу (книга хранит их в своём индексе
+по значению), поэтому один экземпляр можно присваивать любому числу
+ячеек вместо создания нового Font/Alignment/Border на каждую ячейку.
+"""
+from openpyxl.styles import Font, Alignment, Border, Side, PatternFill, NamedStyle
+
+
+# Шрифты
+FONT_9 = Font(name='Arial', size=9)
+FONT_9_BOLD = Font(name='Arial', size=9, bold=True)
+FONT_10 = Font(name='Arial', size=10)
+FONT_10_BOLD = Font(name='Arial', size=10, bold=True)
+FONT_11 = Font(name='Arial', size=11)
+FONT_11_BOLD = Font(name='Arial', size=11, bold=True)
+FONT_12 = Font(name='Arial', size=12)
+FONT_14_BOLD = Font(name='Arial', size=14, bold=True)
+FONT_16_BOLD = Font(name='Arial', size=16, bold=True)
+
+# Выравнивание
+ALIGN_CENTER = Alignment(horizontal='center', vertical='center')
+ALIGN_CENTER_WRAP = Alignment(horizontal='center', vertical='center', wrap_text=True)
+ALIGN_CENTER_TOP_WRAP = Alignment(horizontal='center', vertical='top', wrap_text=True)
+ALIGN_LEFT = Alignment(horizontal='left', vertical='center')
+ALIGN_LEFT_WRAP = Alignment(horizontal='left', vertical='center', wrap_text=True)
+ALIGN_LEFT_TOP_WRAP = Alignment(horizontal='left', vertical='top', wrap_text=True)
+ALIGN_RIGHT = Alignment(horizontal='right', vertical='center')
+
+# Границы и заливка
+_THIN = Side(style='thin')
+THIN_BORDER = Border(left=_THIN, right=_THIN, top=_THIN, bottom=_THIN)
+YELLOW_FILL = PatternFill(start_color='FFFF00', end_color='FFFF00', fill_type='solid')
+
+
+# Именованные стили ячеек таблицы: имя -> (шрифт, выравнивание), все с тонкой рамкой.
+# Присваивание cell.style = имя ставит шрифт, выравнивание и рамку одной операцией
+# вместо трёх отдельных записей стиля на ячейку.
+TABLE_STYLES = {
+    'table_header': (FONT_10_BOLD, ALIGN_CENTER_WRAP),
+    'table_header_9': (FONT_9_BOLD, ALIGN_CENTER_WRAP),
+    'cell_center': (FONT_10, ALIGN_CENTER),
+    'cell_center_wrap': (FONT_10, ALIGN_CENTER_WRAP),
+    'cell_left_wrap': (FONT_10, ALIGN_LEFT_WRAP),
+    'cell_right': (FONT_10, ALIGN_RIGHT),
+    'cell9_left_wrap': (FONT_9, ALIGN_LEFT_WRAP),
+    'cell9_left_top_wrap': (FONT_9, ALIGN_LEFT_TOP_WRAP),
+    'cell9_right': (FONT_9, ALIGN_RIGHT),
+    'total_center': (FONT_10_BOLD, ALIGN_CENTER),
+    'total_right': (FONT_10_BOLD, ALIGN_RIGHT),
+}
+
+
+def register_table_styles(wb):
+    """
+    Регистрирует TABLE_STYLES в книге (один раз на книгу)
+
+    NamedStyle привязывается к конкретной книге, поэтому объекты создаются
+    заново для каждой книги, а не хранятся на уровне модуля.
+    """
+    existing = set(wb.named_styles)
+    for name, (font, alignment) in TABLE_STYLES.items():
+        if name not in existing:
+            wb.add_named_style(NamedStyle(name=name, font=font, alignment=alignment, border=THIN_BORDER))
@@ -1,8 +1,39 @@
 """
 Генераторы документов (ИСПРАВЛЕННАЯ ВЕРСИЯ БЕЗ ГРУППИРОВКИ)
 """
+from concurrent.futures import ThreadPoolExecutor
+
 from .invoice import InvoiceGenerator
 from .specification import SpecificationGenerator
 from .packing_list import PackingListGenerator
+from .plan import RowPlan, build_row_plan
+
+__all__ = [
+    'InvoiceGenerator', 'SpecificationGenerator', 'PackingListGenerator',
+    'RowPlan', 'build_row_plan', 'generate_all',
+]
+
+
+def generate_all(jobs, lines, metadata) -> list:
+    """
+    Генерирует несколько документов параллельно
+
+    Документы независимы (у каждого своя книга), поэтому генерируются
+    в пуле потоков; первая ошибка пробрасывается вызывающему. План строк
+    (пары, коробки, итоги) строится один раз и общий для всех документов.
+
+    Args:
+        jobs: список пар (генератор, путь к выходному файлу)
+        lines: список OutputLine
+        metadata: DocumentMetadata
 
-__all__ = ['InvoiceGenerator', 'SpecificationGenerator', 'PackingListGenerator']
+    Returns:
+        Пути созданных файлов в порядке jobs
+    """
+    plan = build_row_plan(lines)
+    with ThreadPoolExecutor(max_workers=len(jobs) or 1) as executor:
+        futures = [
+            executor.submit(generator.generate, lines, metadata, str(output_path), plan)
+            for generator, output_path in jobs
+        ]
+        return [future.result() for future in futures]
@@ -0,0 +1,20 @@
+"""
+Общие тексты подвала документов
+"""
+from ..models import DocumentMetadata
+
+
+# Условия оплаты (одинаковые в инвойсе и спецификации)
+PAYMENT_TERMS_TEMPLATE = (
+    "Payment of the cost of this transaction for the delivery of the goods specified above in the framework of the execution of Contract No. {contract_number} dated {contract_date} in the amount of {amount} is payable no later than 120 days from the date of filing the Declaration for the goods in the country of Import./ "
+    "Оплата стоимости данной сделки по поставке товара, указанного выше в рамках исполнения Контракта № {contract_number} от {contract_date} г. в размере {amount} подлежит оплате не позднее 120 дней с даты подачи Декларации на товар в стране Импорта"
+)
+
+
+def payment_terms(metadata: DocumentMetadata, total_amount) -> str:
+    """Текст условий оплаты; сумма форматируется один раз для обеих языковых частей"""
+    return PAYMENT_TERMS_TEMPLATE.format(
+        contract_number=metadata.contract_number,
+        contract_date=metadata.contract_date,
+        amount=f"¥ {total_amount:,.2f}",
+    )
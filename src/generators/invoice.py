@@ -2,14 +2,36 @@
 Генератор Invoice БЕЗ группировки
 Выводит все строки из output_lines подряд
 """
-import pandas as pd
-from typing import List
+from typing import List, Optional
+
+from openpyxl import Workbook
+
+from ..formatters import InvoiceFormatter
 from ..models import OutputLine, DocumentMetadata
+from .footer import payment_terms
+from .plan import RowPlan, build_row_plan
 
 
 class InvoiceGenerator:
     """Генератор Инвойса"""
 
+    sheet_name = "Invoice"
+
+    # Заголовок таблицы (не зависит от данных)
+    TABLE_HEADER = (
+        "№",
+        "Brand / Марка",
+        "Code / Код ТНВЭД",
+        "Factory code / Артикул",
+        " Description / Описание",
+        "Qty of pairs\nКол-во пар",
+        "Net weight\nВес нетто, кг",
+        "Gross weight\nВес брутто, кг",
+        "Qty of places\nКол-во мест",
+        "Price / Цена, cny",
+        "Amount / \nСумма, cny",
+    )
+
     def __init__(self, config: dict, preset: dict, mode: str = 'container'):
         """
         Args:
@@ -25,173 +47,121 @@ class InvoiceGenerator:
             self,
             lines: List[OutputLine],
             metadata: DocumentMetadata,
-            output_path: str
+            output_path: str,
+            plan: Optional[RowPlan] = None
     ) -> str:
         """
         Генерирует Invoice по шаблону
-        
+
+        Args:
+            plan: план строк (build_row_plan); если не передан, строится по lines
+
         Returns:
             путь к сохраненному файлу
         """
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Sheet1'  # sheet_name - только для листа в общем файле
 
-        rows = []
+        self.populate_sheet(ws, lines, metadata, plan)
 
+        wb.save(output_path)
+        wb.close()
+
+        return output_path
+
+    def populate_sheet(self, ws, lines: List[OutputLine], metadata: DocumentMetadata,
+                        plan: Optional[RowPlan] = None):
+        """
+        Заполняет и форматирует лист Invoice
+
+        Используется как для отдельного файла, так и для листа в общем файле
+        """
         # Шапка документа
         seller_name_full = f"{metadata.seller_name} ({metadata.seller_name_en})" if metadata.seller_name_en else metadata.seller_name
-        rows.append([seller_name_full])
-        rows.append([metadata.seller_address])
-        rows.append([metadata.seller_address_en if metadata.seller_address_en else ''])
-        rows.append([f"ТЕЛ/TEL:  {self.preset['seller']['phone']}"])
-        rows.append([''])  # Пустая строка
-        rows.append([f"COMMERCIAL INVOICE / КОММЕРЧЕСКИЙ ИНВОЙС № {metadata.invoice_number} from/от {metadata.date}"])
-        rows.append([''])  # Пустая строка
+        ws.append([seller_name_full])
+        ws.append([metadata.seller_address])
+        ws.append([metadata.seller_address_en if metadata.seller_address_en else ''])
+        ws.append([f"ТЕЛ/TEL:  {self.preset['seller']['phone']}"])
+        ws.append([''])  # Пустая строка
+        ws.append([f"COMMERCIAL INVOICE / КОММЕРЧЕСКИЙ ИНВОЙС № {metadata.invoice_number} from/от {metadata.date}"])
+        ws.append([''])  # Пустая строка
         buyer_text = f"Buyer / Покупатель: {metadata.buyer_name}\n{metadata.buyer_address}"
         if metadata.buyer_address_en:
             buyer_text += f"\n({metadata.buyer_address_en})"
-        rows.append([buyer_text])
-        rows.append([f"Contract / Контракт №{metadata.contract_number} from/от {metadata.contract_date}"])
+        ws.append([buyer_text])
+        ws.append([f"Contract / Контракт №{metadata.contract_number} from/от {metadata.contract_date}"])
 
         container_text = f"Terms of delivery / Условия поставки: {metadata.terms_of_delivery}"
         container_row = [container_text, '', '', '', '', '', '', '', '', f"Container No / Контейнер № {metadata.container_number}"]
-        rows.append(container_row)
-
-        rows.append([''])  # Пустая строка
-
-        header = [
-            "№",
-            "Brand / Марка",
-            "Code / Код ТНВЭД",
-            "Factory code / Артикул",
-            " Description / Описание",
-            "Qty of pairs\nКол-во пар",
-            "Net weight\nВес нетто, кг",
-            "Gross weight\nВес брутто, кг",
-            "Qty of places\nКол-во мест",
-            "Price / Цена, cny",
-            "Amount / \nСумма, cny"
-        ]
-        rows.append(header)
+        ws.append(container_row)
+
+        ws.append([''])  # Пустая строка
+
+        ws.append(self.TABLE_HEADER)
 
         # КЛЮЧЕВОЕ ИЗМЕНЕНИЕ: БЕЗ ГРУППИРОВКИ - просто все строки подряд!
-        total_qty = 0
-        total_net = 0
-        total_gross = 0
-        total_boxes = 0
-        total_amount = 0
-        
+        # Пары строк, коробки и итоги общие для всех документов - см. build_row_plan
+        if plan is None:
+            plan = build_row_plan(lines)
+
         data_start_row = 13  # Строка, где начинаются данные (после заголовка)
-        
-        # Отслеживаем номер позиции и пары строк для объединения boxes
-        item_number = 0
-        prev_line = None
-
-        for idx, line in enumerate(lines):
-            # Определяем является ли строка "второй частью" артикула
-            is_continuation = (
-                prev_line is not None and
-                line.article == prev_line.article and
-                "более 24см" in line.insole_category and
-                line.boxes == 0 and
-                "до 24см" in prev_line.insole_category
-            )
-
-            item_number += 1
 
+        rows = zip(lines, plan.boxes_values, plan.float_values)
+        for item_number, (line, boxes_value, (net, gross, price, amount)) in enumerate(rows, start=1):
             # Формируем описание в зависимости от режима
             if self.mode == 'shipment':
                 description = line.description
             else:
                 description = f"{line.description}, материал верха: {line.material}, {line.insole_category}"
 
-            rows.append([
+            ws.append([
                 item_number,
                 line.brand,
                 line.hs_code,
                 line.article,
                 description,
                 line.quantity,
-                float(line.net_weight),
-                float(line.gross_weight),
-                '',  # Boxes - будет заполнено после объединения ячеек
-                float(line.price),
-                float(line.amount)
+                net,
+                gross,
+                boxes_value,  # Boxes (для пары строк - после объединения)
+                price,
+                amount
             ])
 
-            total_qty += line.quantity
-            total_net += line.net_weight
-            total_gross += line.gross_weight
-            # ИСПРАВЛЕНО: Правильный подсчет boxes
-            # Для второй строки пары (is_continuation) НЕ добавляем boxes,
-            # так как они уже были добавлены в первой строке
-            if not is_continuation:
-                total_boxes += line.boxes
-            total_amount += line.amount
-            
-            prev_line = line
-
-        data_end_row = len(rows)  # Последняя строка с данными
+        data_end_row = ws.max_row  # Последняя строка с данными
+        total_qty, total_amount, total_net, total_gross = plan.totals
+        total_boxes = plan.total_boxes
 
         # Итоговая строка
-        rows.append(['', '', '', '', 'Total / Итого:', total_qty, round(float(total_net), 3), round(float(total_gross), 3), total_boxes, '', f"¥{total_amount:,.2f}".replace(',', ' ')])
+        ws.append(['', '', '', '', 'Total / Итого:', total_qty, round(float(total_net), 3), round(float(total_gross), 3), total_boxes, '', f"¥{total_amount:,.2f}".replace(',', ' ')])
 
         # Футер
-        rows.append([f"-Manufacturer / Производитель: {metadata.seller_name}"])
-        rows.append([f"-Country of origin / Страна происхождения: {self.preset['delivery']['country_of_origin_en']} / {self.preset['delivery']['country_of_origin']}"])
-        rows.append(["-Country of destination / Страна назначения: Russia / Россия"])
-        rows.append(["-Product not for military use / Товар не для применения в военных целях"])
-        rows.append(["-Terms of payment / Условия оплаты:"])
-        rows.append([f"Payment of the cost of this transaction for the delivery of the goods specified above in the framework of the execution of Contract No. {metadata.contract_number} dated {metadata.contract_date} in the amount of ¥ {total_amount:,.2f} is payable no later than 120 days from the date of filing the Declaration for the goods in the country of Import./ Оплата стоимости данной сделки по поставке товара, указанного выше в рамках исполнения Контракта № {metadata.contract_number} от {metadata.contract_date} г. в размере ¥ {total_amount:,.2f} подлежит оплате не позднее 120 дней с даты подачи Декларации на товар в стране Импорта"])
-
-        # Создаем DataFrame и сохраняем без форматирования
-        df = pd.DataFrame(rows)
-        # ВАЖНО: Используем контекстный менеджер чтобы файл корректно закрылся
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, header=False)
-        
-        # Объединяем ячейки boxes для пар строк
-        from openpyxl import load_workbook
-        wb = load_workbook(output_path)
-        ws = wb.active
-        
+        ws.append([f"-Manufacturer / Производитель: {metadata.seller_name}"])
+        ws.append([f"-Country of origin / Страна происхождения: {self.preset['delivery']['country_of_origin_en']} / {self.preset['delivery']['country_of_origin']}"])
+        ws.append(["-Country of destination / Страна назначения: Russia / Россия"])
+        ws.append(["-Product not for military use / Товар не для применения в военных целях"])
+        ws.append(["-Terms of payment / Условия оплаты:"])
+        ws.append([payment_terms(metadata, total_amount)])
+
         # Объединяем ячейки boxes для пар строк
-        self._merge_cells_container(ws, lines, data_start_row)
-        
-        wb.save(output_path)
-        wb.close()
-        
+        self._merge_cells_container(ws, [(data_start_row + idx, boxes) for idx, boxes in plan.box_merges])
+
         # Применяем форматирование
-        from ..formatters import InvoiceFormatter
         formatter = InvoiceFormatter(self.config)
-        formatter.format(output_path, data_start_row, data_end_row)
+        formatter.format_sheet(ws, data_start_row, data_end_row)
 
-        return output_path
-
-    def _merge_cells_container(self, ws, lines: List[OutputLine], data_start_row: int):
+    def _merge_cells_container(self, ws, box_merges):
         """
         Объединяет ячейки boxes для пар строк с одним артикулом (≤24см и >24см)
 
         Колонка I = Qty of places (коробки)
+
+        Args:
+            box_merges: список (первая строка пары, исходное кол-во коробок)
         """
-        prev_line = None
-        current_row = data_start_row
-
-        for line in lines:
-            is_continuation = (
-                prev_line is not None and
-                line.article == prev_line.article and
-                "более 24см" in line.insole_category and
-                line.boxes == 0 and
-                "до 24см" in prev_line.insole_category
-            )
-
-            if is_continuation:
-                # Объединяем ячейки boxes (колонка I) для предыдущей и текущей строки
-                ws.merge_cells(f'I{current_row-1}:I{current_row}')
-                # Записываем ИСХОДНОЕ значение boxes
-                ws[f'I{current_row-1}'] = line.original_boxes
-            elif line.boxes > 0:
-                # Для обычных строк просто записываем значение
-                ws[f'I{current_row}'] = line.boxes
-
-            current_row += 1
-            prev_line = line
+        for row, original_boxes in box_merges:
+            # Объединяем ячейки boxes (колонка I) для строки и следующей за ней
+            ws.merge_cells(start_row=row, start_column=9, end_row=row + 1, end_column=9)
+            # Записываем ИСХОДНОЕ значение boxes
+            ws.cell(row=row, column=9).value = original_boxes
@@ -2,14 +2,35 @@
 Генератор Packing List БЕЗ группировки
 Выводит все строки из output_lines подряд
 """
-import pandas as pd
-from typing import List
+from typing import List, Optional
+
+from openpyxl import Workbook
+
+from ..formatters import PackingListFormatter
 from ..models import OutputLine, DocumentMetadata
+from .plan import RowPlan, build_row_plan
 
 
 class PackingListGenerator:
     """Генератор Упаковочного листа"""
 
+    sheet_name = "Packing List"
+
+    # Заголовок таблицы (не зависит от данных)
+    TABLE_HEADER = (
+        "№",
+        "Brand / Марка",
+        "Code / Код ТНВЭД",
+        "Factory code / Артикул",
+        " Description / Описание",
+        "Color / Цвет",
+        "Quantity of pairs / Количество пар",
+        "Net weight, kg / Вес нетто, кг",
+        "Gross weight, kg / Вес брутто, кг",
+        "Quantity of places / Количество мест",
+        "Type of packaging / Вид упаковки",
+    )
+
     def __init__(self, config: dict, preset: dict, mode: str = 'container'):
         """
         Args:
@@ -25,73 +46,61 @@ class PackingListGenerator:
             self,
             lines: List[OutputLine],
             metadata: DocumentMetadata,
-            output_path: str
+            output_path: str,
+            plan: Optional[RowPlan] = None
     ) -> str:
         """Генерирует Packing List"""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Sheet1'  # sheet_name - только для листа в общем файле
+
+        self.populate_sheet(ws, lines, metadata, plan)
+
+        wb.save(output_path)
+        wb.close()
+
+        return output_path
 
-        rows = []
+    def populate_sheet(self, ws, lines: List[OutputLine], metadata: DocumentMetadata,
+                        plan: Optional[RowPlan] = None):
+        """
+        Заполняет и форматирует лист Packing List
 
+        Используется как для отдельного файла, так и для листа в общем файле
+        """
         # Шапка
-        rows.append([f"{metadata.seller_name} ({self.preset['seller']['name_en']})"])
-        rows.append([metadata.seller_address])
-        rows.append([metadata.seller_address_en])
-        rows.append([f"ТЕЛ/TEL:  {self.preset['seller']['phone']}"])
-        rows.append([''])  # Пустая строка
-        rows.append([f"Packing list / Упаковочный лист № {metadata.invoice_number} from/от {metadata.date}"])
-        rows.append([''])  # Пустая строка
-        rows.append([f"Buyer / Покупатель: {metadata.buyer_name}"])
+        ws.append([f"{metadata.seller_name} ({self.preset['seller']['name_en']})"])
+        ws.append([metadata.seller_address])
+        ws.append([metadata.seller_address_en])
+        ws.append([f"ТЕЛ/TEL:  {self.preset['seller']['phone']}"])
+        ws.append([''])  # Пустая строка
+        ws.append([f"Packing list / Упаковочный лист № {metadata.invoice_number} from/от {metadata.date}"])
+        ws.append([''])  # Пустая строка
+        ws.append([f"Buyer / Покупатель: {metadata.buyer_name}"])
         address_text = metadata.buyer_address
         if metadata.buyer_address_en:
             address_text += f"\n({metadata.buyer_address_en})"
-        rows.append([address_text])
-        rows.append([f"Contract / Контракт №{metadata.contract_number} from/от {metadata.contract_date}"])
+        ws.append([address_text])
+        ws.append([f"Contract / Контракт №{metadata.contract_number} from/от {metadata.contract_date}"])
 
         container_text = f"Terms of delivery / Условия поставки: {metadata.terms_of_delivery}"
         container_row = [container_text, '', '', '', '', '', '', '', '', f"Container No / Контейнер № {metadata.container_number}"]
-        rows.append(container_row)
-
-        rows.append([''])  # Пустая строка
-
-        header = [
-            "№",
-            "Brand / Марка",
-            "Code / Код ТНВЭД",
-            "Factory code / Артикул",
-            " Description / Описание",
-            "Color / Цвет",
-            "Quantity of pairs / Количество пар",
-            "Net weight, kg / Вес нетто, кг",
-            "Gross weight, kg / Вес брутто, кг",
-            "Quantity of places / Количество мест",
-            "Type of packaging / Вид упаковки"
-        ]
-        rows.append(header)
+        ws.append(container_row)
+
+        ws.append([''])  # Пустая строка
+
+        ws.append(self.TABLE_HEADER)
 
         # КЛЮЧЕВОЕ ИЗМЕНЕНИЕ: БЕЗ ГРУППИРОВКИ - просто все строки подряд!
-        total_qty = 0
-        total_net = 0
-        total_gross = 0
-        total_boxes = 0
-        
+        # Пары строк, коробки и итоги общие для всех документов - см. build_row_plan
+        if plan is None:
+            plan = build_row_plan(lines)
+
         data_start_row = 14  # Строка, где начинаются данные (строка 13 — заголовок таблицы)
-        
-        # Отслеживаем номер позиции и пары строк
-        item_number = 0
-        prev_line = None
-
-        for idx, line in enumerate(lines):
-            # Определяем является ли строка "второй частью" артикула
-            is_continuation = (
-                prev_line is not None and
-                line.article == prev_line.article and
-                "более 24см" in line.insole_category and
-                line.boxes == 0 and
-                "до 24см" in prev_line.insole_category
-            )
-            
-            item_number += 1
-
-            rows.append([
+
+        rows = zip(lines, plan.continuation, plan.boxes_values, plan.float_values)
+        for item_number, (line, is_continuation, boxes_value, (net, gross, _, _)) in enumerate(rows, start=1):
+            ws.append([
                 item_number,
                 line.brand,
                 line.hs_code,
@@ -99,80 +108,39 @@ class PackingListGenerator:
                 line.description,
                 line.color,
                 line.quantity,
-                float(line.net_weight),
-                float(line.gross_weight),
-                '',  # Boxes - будет заполнено после объединения
+                net,
+                gross,
+                boxes_value,  # Boxes (для пары строк - после объединения)
                 "cardboard box / \nкартонная коробка" if line.boxes > 0 or is_continuation else ''
             ])
 
-            total_qty += line.quantity
-            total_net += line.net_weight
-            total_gross += line.gross_weight
-            # ИСПРАВЛЕНО: Правильный подсчет boxes
-            # Для второй строки пары (is_continuation) НЕ добавляем boxes,
-            # так как они уже были добавлены в первой строке
-            if not is_continuation:
-                total_boxes += line.boxes
-            
-            prev_line = line
-
-        data_end_row = len(rows)  # Последняя строка с данными
+        data_end_row = ws.max_row  # Последняя строка с данными
+        total_qty, _, total_net, total_gross = plan.totals
+        total_boxes = plan.total_boxes
 
         # Итоги
-        rows.append(['', '', '', '', '', 'Итого:', total_qty, round(float(total_net), 3), round(float(total_gross), 3), total_boxes, ''])
-        rows.append([f"Total net weight, kgs / Общий вес нетто: {total_net:,.2f} кг"])
-        rows.append([f"Total gross weight, kg / Общий вес брутто: {total_gross:,.2f} кг"])
-        rows.append([f"Total quantity of pairs / Общее кол-во пар: {total_qty}"])
-        rows.append([f"Total quantity of places / Общее кол-во мест: {total_boxes}"])
-
-        # Создаем DataFrame и сохраняем
-        df = pd.DataFrame(rows)
-        # ВАЖНО: Используем контекстный менеджер чтобы файл корректно закрылся
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, header=False)
-        
-        # Объединяем ячейки boxes для пар строк
-        from openpyxl import load_workbook
-        wb = load_workbook(output_path)
-        ws = wb.active
-        
+        ws.append(['', '', '', '', '', 'Итого:', total_qty, round(float(total_net), 3), round(float(total_gross), 3), total_boxes, ''])
+        ws.append([f"Total net weight, kgs / Общий вес нетто: {total_net:,.2f} кг"])
+        ws.append([f"Total gross weight, kg / Общий вес брутто: {total_gross:,.2f} кг"])
+        ws.append([f"Total quantity of pairs / Общее кол-во пар: {total_qty}"])
+        ws.append([f"Total quantity of places / Общее кол-во мест: {total_boxes}"])
+
         # Объединяем ячейки boxes для пар строк
-        self._merge_boxes_container(ws, lines, data_start_row)
-        
-        wb.save(output_path)
-        wb.close()
-        
+        self._merge_boxes_container(ws, [(data_start_row + idx, boxes) for idx, boxes in plan.box_merges])
+
         # Применяем форматирование
-        from ..formatters import PackingListFormatter
         formatter = PackingListFormatter(self.config)
-        formatter.format(output_path, data_start_row, data_end_row)
-
-        return output_path
+        formatter.format_sheet(ws, data_start_row, data_end_row)
 
-    def _merge_boxes_container(self, ws, lines: List[OutputLine], data_start_row: int):
+    def _merge_boxes_container(self, ws, box_merges):
         """
         Объединяет ячейки boxes для пар строк с одним артикулом (≤24см и >24см)
+
+        Args:
+            box_merges: список (первая строка пары, исходное кол-во коробок)
         """
-        prev_line = None
-        current_row = data_start_row
-
-        for line in lines:
-            is_continuation = (
-                prev_line is not None and
-                line.article == prev_line.article and
-                "более 24см" in line.insole_category and
-                line.boxes == 0 and
-                "до 24см" in prev_line.insole_category
-            )
-
-            if is_continuation:
-                # Объединяем ячейки boxes (колонка J) для предыдущей и текущей строки
-                ws.merge_cells(f'J{current_row-1}:J{current_row}')
-                # Записываем ИСХОДНОЕ значение boxes (сумма обеих строк)
-                ws[f'J{current_row-1}'] = line.original_boxes
-            elif line.boxes > 0:
-                # Для обычных строк просто записываем значение
-                ws[f'J{current_row}'] = line.boxes
-
-            current_row += 1
-            prev_line = line
+        for row, original_boxes in box_merges:
+            # Объединяем ячейки boxes (колонка J) для строки и следующей за ней
+            ws.merge_cells(start_row=row, start_column=10, end_row=row + 1, end_column=10)
+            # Записываем ИСХОДНОЕ значение boxes
+            ws.cell(row=row, column=10).value = original_boxes
@@ -0,0 +1,65 @@
+"""
+Общий план строк таблицы для всех документов
+
+Инвойс, спецификация и упаковочный лист выводят одни и те же строки в
+разных колонках: пары строк артикула, объединения коробок и итоги у них
+совпадают, поэтому считаются один раз.
+"""
+from typing import List, NamedTuple, Tuple
+
+from ..models import OutputLine, LineTotals, line_totals
+
+
+class RowPlan(NamedTuple):
+    """Разметка строк таблицы, общая для всех документов"""
+    continuation: List[bool]  # строка - "вторая часть" артикула
+    boxes_values: list  # значение ячейки коробок (None - под объединённой ячейкой)
+    box_merges: List[Tuple[int, int]]  # (индекс первой строки пары, исходное кол-во коробок)
+    float_values: List[Tuple[float, float, float, float]]  # (нетто, брутто, цена, сумма) для ячеек
+    totals: LineTotals
+    total_boxes: int  # вторые части пар не считаются - их коробки уже в первой строке
+
+
+def continuation_flags(lines: List[OutputLine]) -> List[bool]:
+    """
+    Отмечает строки - "вторые части" артикула
+
+    Строка продолжает предыдущую, если у них один артикул, предыдущая -
+    "до 24см", текущая - "более 24см" без своих коробок. Коробки такой
+    пары объединяются в одну ячейку.
+    """
+    flags = [False] * len(lines)
+    for idx in range(1, len(lines)):
+        line = lines[idx]
+        prev_line = lines[idx - 1]
+        flags[idx] = (
+            line.article == prev_line.article and
+            "более 24см" in line.insole_category and
+            line.boxes == 0 and
+            "до 24см" in prev_line.insole_category
+        )
+    return flags
+
+
+def build_row_plan(lines: List[OutputLine]) -> RowPlan:
+    """Строит план строк за один проход по lines"""
+    flags = continuation_flags(lines)
+    boxes_values = []
+    box_merges = []
+    # Decimal -> float для ячеек один раз на строку, а не в каждом документе
+    float_values = [
+        (float(line.net_weight), float(line.gross_weight), float(line.price), float(line.amount))
+        for line in lines
+    ]
+    total_boxes = 0
+
+    for idx, (line, is_continuation) in enumerate(zip(lines, flags)):
+        if is_continuation:
+            # Ячейки boxes предыдущей и текущей строки объединяются после заполнения листа
+            box_merges.append((idx - 1, line.original_boxes))
+            boxes_values.append(None)
+        else:
+            boxes_values.append(line.boxes if line.boxes > 0 else '')
+            total_boxes += line.boxes
+
+    return RowPlan(flags, boxes_values, box_merges, float_values, line_totals(lines), total_boxes)
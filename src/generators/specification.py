@@ -2,14 +2,43 @@
 Генератор Specification БЕЗ группировки
 Выводит все строки из output_lines подряд
 """
-import pandas as pd
-from typing import List
+from typing import List, Optional
+
+from openpyxl import Workbook
+
+from ..formatters import SpecificationFormatter
 from ..models import OutputLine, DocumentMetadata
+from .footer import payment_terms
+from .plan import RowPlan, build_row_plan
 
 
 class SpecificationGenerator:
     """Генератор Спецификации"""
 
+    sheet_name = "Specification"
+
+    # Заголовок таблицы (не зависит от данных)
+    TABLE_HEADER = (
+        "№",
+        "Brand / Марка",
+        "Code / Код ТНВЭД",
+        "Factory code / Артикул",
+        " Description / Описание",
+        "Color / Цвет",
+        "Top material / Материал верха",
+        "Lining material / Материал подкладки",
+        "Outsole material / Материал подошвы",
+        "Heel height / Высота каблука",
+        "Insole length / Длина стельки",
+        "Quantity of pairs / Количество пар",
+        "Net weight (kg) / Вес нетто (кг)",
+        "Gross weight (kg) / Вес брутто (кг)",
+        "Quantity of places / Количество мест",
+        "Price / Цена, cny",
+        "Amount / Сумма, cny",
+        "КИЗ",
+    )
+
     def __init__(self, config: dict, preset: dict, mode: str = 'container'):
         """
         Args:
@@ -25,72 +54,52 @@ class SpecificationGenerator:
             self,
             lines: List[OutputLine],
             metadata: DocumentMetadata,
-            output_path: str
+            output_path: str,
+            plan: Optional[RowPlan] = None
     ) -> str:
         """Генерирует Specification"""
+        wb = Workbook()
+        ws = wb.active
+        ws.title = 'Sheet1'  # sheet_name - только для листа в общем файле
+
+        self.populate_sheet(ws, lines, metadata, plan)
+
+        wb.save(output_path)
+        wb.close()
+
+        return output_path
 
-        rows = []
+    def populate_sheet(self, ws, lines: List[OutputLine], metadata: DocumentMetadata,
+                        plan: Optional[RowPlan] = None):
+        """
+        Заполняет и форматирует лист Specification
 
+        Используется как для отдельного файла, так и для листа в общем файле
+        """
         # Шапка (по эталону: 2 строки данных + пустые)
-        rows.append([f'Спецификация к Контракту/ Specification to the Contract №{metadata.contract_number} from/от {metadata.contract_date}'])
-        rows.append([f'Container No / Контейнер № {metadata.container_number}'])
-        rows.append([''])  # Пустая строка 3
-        rows.append([''])  # Пустая строка 4
-        rows.append([''])  # Пустая строка 5
-        rows.append([''])  # Пустая строка 6
-        rows.append([''])  # Пустая строка 7
-        rows.append([f'Specification / Спецификация № {metadata.invoice_number} from/от {metadata.date}'])
-
-        rows.append([''])  # Пустая строка 9
-
-        header = [
-            "№",
-            "Brand / Марка",
-            "Code / Код ТНВЭД",
-            "Factory code / Артикул",
-            " Description / Описание",
-            "Color / Цвет",
-            "Top material / Материал верха",
-            "Lining material / Материал подкладки",
-            "Outsole material / Материал подошвы",
-            "Heel height / Высота каблука",
-            "Insole length / Длина стельки",
-            "Quantity of pairs / Количество пар",
-            "Net weight (kg) / Вес нетто (кг)",
-            "Gross weight (kg) / Вес брутто (кг)",
-            "Quantity of places / Количество мест",
-            "Price / Цена, cny",
-            "Amount / Сумма, cny",
-            "КИЗ"
-        ]
-        rows.append(header)
+        ws.append([f'Спецификация к Контракту/ Specification to the Contract №{metadata.contract_number} from/от {metadata.contract_date}'])
+        ws.append([f'Container No / Контейнер № {metadata.container_number}'])
+        ws.append([''])  # Пустая строка 3
+        ws.append([''])  # Пустая строка 4
+        ws.append([''])  # Пустая строка 5
+        ws.append([''])  # Пустая строка 6
+        ws.append([''])  # Пустая строка 7
+        ws.append([f'Specification / Спецификация № {metadata.invoice_number} from/от {metadata.date}'])
+
+        ws.append([''])  # Пустая строка 9
+
+        ws.append(self.TABLE_HEADER)
 
         # КЛЮЧЕВОЕ ИЗМЕНЕНИЕ: БЕЗ ГРУППИРОВКИ - просто все строки подряд!
-        total_qty = 0
-        total_net = 0
-        total_gross = 0
-        total_boxes = 0
-        total_amount = 0
-        
+        # Пары строк, коробки и итоги общие для всех документов - см. build_row_plan
+        if plan is None:
+            plan = build_row_plan(lines)
+
         data_start_row = 11  # Строка, где начинаются данные (как в эталоне)
-        
-        # Отслеживаем номер позиции и пары строк
-        item_number = 0
-        prev_line = None
-
-        for idx, line in enumerate(lines):
-            # Определяем является ли строка "второй частью" артикула
-            is_continuation = (
-                prev_line is not None and
-                line.article == prev_line.article and
-                "более 24см" in line.insole_category and
-                line.boxes == 0 and
-                "до 24см" in prev_line.insole_category
-            )
-
-            item_number += 1
-
-            rows.append([
+
+        rows = zip(lines, plan.boxes_values, plan.float_values)
+        for item_number, (line, boxes_value, (net, gross, price, amount)) in enumerate(rows, start=1):
+            ws.append([
                 item_number,
                 line.brand,
                 line.hs_code,
@@ -103,94 +112,52 @@ class SpecificationGenerator:
                 line.heel_height,
                 line.insole_category,
                 line.quantity,
-                float(line.net_weight),
-                float(line.gross_weight),
-                '',  # Boxes - будет заполнено после объединения
-                float(line.price),
-                float(line.amount),
+                net,
+                gross,
+                boxes_value,  # Boxes (для пары строк - после объединения)
+                price,
+                amount,
                 '\n'.join(line.kiz_codes) if line.kiz_codes else ''
             ])
 
-            total_qty += line.quantity
-            total_net += line.net_weight
-            total_gross += line.gross_weight
-            # ИСПРАВЛЕНО: Правильный подсчет boxes
-            # Для второй строки пары (is_continuation) НЕ добавляем boxes,
-            # так как они уже были добавлены в первой строке
-            if not is_continuation:
-                total_boxes += line.boxes
-            total_amount += line.amount
-            
-            prev_line = line
-
-        data_end_row = len(rows)  # Последняя строка с данными
+        data_end_row = ws.max_row  # Последняя строка с данными
+        total_qty, total_amount, total_net, total_gross = plan.totals
+        total_boxes = plan.total_boxes
 
         # Итоги
-        rows.append(['', '', '', '', 'Total / Итого:', '', '', '', '', '', '', total_qty, round(float(total_net), 3), round(float(total_gross), 3), total_boxes, '', float(total_amount), ''])
+        ws.append(['', '', '', '', 'Total / Итого:', '', '', '', '', '', '', total_qty, round(float(total_net), 3), round(float(total_gross), 3), total_boxes, '', float(total_amount), ''])
 
         # Футер с подписями
-        rows.append([f"-Manufacturer / Производитель: {metadata.seller_name}"])
-        rows.append([f"-Country of origin / Страна происхождения: {self.preset['delivery']['country_of_origin_en']} / {self.preset['delivery']['country_of_origin']}"])
-        rows.append(["-Country of destination / Страна назначения: Russia / Россия"])
-        rows.append(["-Product not for military use / Товар не для применения в военных целях"])
-        rows.append([f"-Terms of delivery / Условия поставки: {metadata.terms_of_delivery}"])
-        rows.append(["-Terms of payment / Условия оплаты:"])
-        rows.append([f"Payment of the cost of this transaction for the delivery of the goods specified above in the framework of the execution of Contract No. {metadata.contract_number} dated {metadata.contract_date} in the amount of ¥ {total_amount:,.2f} is payable no later than 120 days from the date of filing the Declaration for the goods in the country of Import./ Оплата стоимости данной сделки по поставке товара, указанного выше в рамках исполнения Контракта № {metadata.contract_number} от {metadata.contract_date} г. в размере ¥ {total_amount:,.2f} подлежит оплате не позднее 120 дней с даты подачи Декларации на товар в стране Импорта"])
+        ws.append([f"-Manufacturer / Производитель: {metadata.seller_name}"])
+        ws.append([f"-Country of origin / Страна происхождения: {self.preset['delivery']['country_of_origin_en']} / {self.preset['delivery']['country_of_origin']}"])
+        ws.append(["-Country of destination / Страна назначения: Russia / Россия"])
+        ws.append(["-Product not for military use / Товар не для применения в военных целях"])
+        ws.append([f"-Terms of delivery / Условия поставки: {metadata.terms_of_delivery}"])
+        ws.append(["-Terms of payment / Условия оплаты:"])
+        ws.append([payment_terms(metadata, total_amount)])
 
         # Подписи (только в Specification!)
-        rows.append(['', 'Buyer / Покупатель:', '', '', '', '', '', '', '', '', 'Seller / Продавец:', '', '', '', '', '', '', ''])
-        rows.append(['', metadata.buyer_name.split('/')[0].strip(), '', '', '', '', '', '', '', '', metadata.seller_name, '', '', '', '', '', '', ''])
-
-        # Создаем DataFrame и сохраняем
-        df = pd.DataFrame(rows)
-        # ВАЖНО: Используем контекстный менеджер чтобы файл корректно закрылся
-        with pd.ExcelWriter(output_path, engine='openpyxl') as writer:
-            df.to_excel(writer, index=False, header=False)
-        
-        # Объединяем ячейки boxes для пар строк
-        from openpyxl import load_workbook
-        wb = load_workbook(output_path)
-        ws = wb.active
-        
-        # Объединяем ячейки boxes для пар строк
-        self._merge_cells_container(ws, lines, data_start_row)
+        ws.append(['', 'Buyer / Покупатель:', '', '', '', '', '', '', '', '', 'Seller / Продавец:', '', '', '', '', '', '', ''])
+        ws.append(['', metadata.buyer_name.split('/')[0].strip(), '', '', '', '', '', '', '', '', metadata.seller_name, '', '', '', '', '', '', ''])
 
-        wb.save(output_path)
-        wb.close()
+        # Объединяем ячейки boxes для пар строк
+        self._merge_cells_container(ws, [(data_start_row + idx, boxes) for idx, boxes in plan.box_merges])
 
         # Применяем форматирование
-        from ..formatters import SpecificationFormatter
         formatter = SpecificationFormatter(self.config)
-        formatter.format(output_path, data_start_row, data_end_row)
-
-        return output_path
+        formatter.format_sheet(ws, data_start_row, data_end_row)
 
-    def _merge_cells_container(self, ws, lines: List[OutputLine], data_start_row: int):
+    def _merge_cells_container(self, ws, box_merges):
         """
         Объединяет ячейки boxes для пар строк с одним артикулом (≤24см и >24см)
 
         Колонка O = Qty of places (коробки)
+
+        Args:
+            box_merges: список (первая строка пары, исходное кол-во коробок)
         """
-        prev_line = None
-        current_row = data_start_row
-
-        for line in lines:
-            is_continuation = (
-                prev_line is not None and
-                line.article == prev_line.article and
-                "более 24см" in line.insole_category and
-                line.boxes == 0 and
-                "до 24см" in prev_line.insole_category
-            )
-
-            if is_continuation:
-                # Объединяем ячейки boxes (колонка O) для предыдущей и текущей строки
-                ws.merge_cells(f'O{current_row-1}:O{current_row}')
-                # Записываем ИСХОДНОЕ значение boxes
-                ws[f'O{current_row-1}'] = line.original_boxes
-            elif line.boxes > 0:
-                # Для обычных строк просто записываем значение
-                ws[f'O{current_row}'] = line.boxes
-
-            current_row += 1
-            prev_line = line
+        for row, original_boxes in box_merges:
+            # Объединяем ячейки boxes (колонка O) для строки и следующей за ней
+            ws.merge_cells(start_row=row, start_column=15, end_row=row + 1, end_column=15)
+            # Записываем ИСХОДНОЕ значение boxes
+            ws.cell(row=row, column=15).value = original_boxes
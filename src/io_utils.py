@@ -0,0 +1,23 @@
+"""
+Чтение входных Excel файлов
+
+Все парсеры (входной файл, отправка грузов, выгрузка КМ) читают данные
+через read_excel, чтобы настройки чтения были в одном месте.
+"""
+import pandas as pd
+
+
+def read_excel(file_path, **kwargs) -> pd.DataFrame:
+    """
+    Читает лист Excel в DataFrame
+
+    Для .xlsx pandas открывает книгу через openpyxl в режиме
+    read_only=True, data_only=True (потоковое чтение без графа ячеек,
+    значения формул вместо самих формул), поэтому отдельная загрузка
+    через load_workbook не нужна.
+
+    Args:
+        file_path: путь к файлу
+        **kwargs: параметры pd.read_excel (sheet_name, header, ...)
+    """
+    return pd.read_excel(file_path, **kwargs)
@@ -43,7 +43,10 @@ class KIZInjector:
         if output_file is None:
             output_file = target_file
 
-        wb = load_workbook(str(target_file))
+        # Файл пересохраняется, поэтому не read_only; макросы в сгенерированных
+        # документах не используются. Внешние связи сохраняются: файл мог быть
+        # отредактирован в Excel после генерации
+        wb = load_workbook(str(target_file), keep_vba=False, data_only=False)
         ws = self._find_spec_sheet(wb, target_file)
 
         rows_updated = 0
@@ -4,11 +4,29 @@
 import pandas as pd
 import re
 import logging
+from functools import lru_cache
+from itertools import chain
 from pathlib import Path
-from typing import List, Dict, Tuple, Optional
+from typing import List, Dict, Tuple, Optional, Sequence
+
+from .io_utils import read_excel
 
 logger = logging.getLogger(__name__)
 
+# Скомпилированные паттерны артикула в номенклатуре, в порядке приоритета (см. KMLoader._extract_article)
+# Основной: "арт." и всё до открывающей скобки; кириллические двойники рядом с латиницей
+_ARTICLE_RE = re.compile(r'арт\.[\s\W]*([A-ZА-ЯЁАВСЕКМНОРТХ0-9][A-ZА-Яа-яЁё0-9\-]+?)(?:\s*[\(,]|\s+[А-Я])', re.IGNORECASE)
+# Запасной вариант: точка + артикул
+_ARTICLE_DOT_RE = re.compile(r'\.[\s\W]*([A-ZА-ЯАВСЕКМНОРТХ]{1,4}[0-9\-]+[A-Za-z0-9\-]*)')
+# Последний шанс: любой паттерн, похожий на артикул
+_ARTICLE_ANY_RE = re.compile(r'([A-ZА-ЯАВСЕКМНОРТХ]{1,2}[0-9]{2,}[A-Z]?[0-9\-]+[A-Z0-9]*)')
+
+# Известные суффиксы упаковки в конце артикула (можно расширять)
+_PACKAGING_SUFFIXES = ('PRG', 'BOX', 'PKG', 'CTN', 'PCS')
+_PACKAGING_SUFFIX_RES = tuple(
+    re.compile(r'\s*' + suffix + r'$', re.IGNORECASE) for suffix in _PACKAGING_SUFFIXES
+)
+
 
 class KMLoader:
     """Загрузчик и хранилище кодов маркировки (КМ)"""
@@ -21,8 +39,16 @@ class KMLoader:
         self.file_path = Path(file_path)
         self._index: Dict[Tuple[str, int], List[str]] = {}
         self._used_indices: Dict[Tuple[str, int], int] = {}  # Отслеживание использованных кодов
+        self._by_article: Dict[str, Dict[int, List[str]]] = {}  # артикул -> {размер: [км, ...]}
+        self._articles: List[str] = []  # Уникальные артикулы индекса (заполняется в _load)
+        self._total_codes = 0
         self._load()
 
+    # Размеры по категориям длины стельки
+    _SIZES_SMALL = (35, 36, 37)  # длина стельки до 24см
+    _SIZES_LARGE = (38, 39, 40, 41)  # длина стельки более 24см
+    _SIZES_ALL = _SIZES_SMALL + _SIZES_LARGE
+
     # Таблица замены кириллических символов-двойников на латинские
     _CYRILLIC_TO_LATIN = {
         'А': 'A', 'В': 'B', 'С': 'C', 'Е': 'E', 'К': 'K',
@@ -30,8 +56,11 @@ class KMLoader:
         'а': 'a', 'в': 'b', 'с': 'c', 'е': 'e', 'к': 'k',
         'м': 'm', 'н': 'h', 'о': 'o', 'р': 'p', 'т': 't', 'х': 'x',
     }
+    _CYRILLIC_TO_LATIN_TABLE = str.maketrans(_CYRILLIC_TO_LATIN)
 
-    def _normalize_article(self, article: str) -> str:
+    @staticmethod
+    @lru_cache(maxsize=4096)
+    def _normalize_article(article: str) -> str:
         """
         Нормализует артикул:
         1. Заменяет кириллические символы-двойники на латинские (С→C, А→A и т.д.)
@@ -41,6 +70,9 @@ class KMLoader:
             'СGL90107-1' -> 'CGL90107-1'  (кириллическая С → латинская C)
             'GL24136-1 PRG' -> 'GL24136-1'
             'GL24136-1PRG' -> 'GL24136-1'
+
+        Результат кэшируется: одни и те же артикулы нормализуются при
+        загрузке справочника и при каждом запросе кодов.
         """
         if not article:
             return article
@@ -48,17 +80,11 @@ class KMLoader:
         article_stripped = str(article).strip()
 
         # Замена кириллических двойников на латинские
-        article_stripped = ''.join(
-            self._CYRILLIC_TO_LATIN.get(ch, ch) for ch in article_stripped
-        )
+        article_stripped = article_stripped.translate(KMLoader._CYRILLIC_TO_LATIN_TABLE)
 
-        # Список известных суффиксов упаковки (можно расширять)
-        packaging_suffixes = ['PRG', 'BOX', 'PKG', 'CTN', 'PCS']
-
-        # Убираем только известные суффиксы (с пробелом или без)
-        for suffix in packaging_suffixes:
-            pattern = r'\s*' + suffix + r'$'
-            article_stripped = re.sub(pattern, '', article_stripped, flags=re.IGNORECASE)
+        # Убираем только известные суффиксы (с пробелом или без), по очереди
+        for pattern in _PACKAGING_SUFFIX_RES:
+            article_stripped = pattern.sub('', article_stripped)
 
         return article_stripped
 
@@ -73,29 +99,53 @@ class KMLoader:
             'Туфли арт.CA23C1030-153(...)' -> 'CA23C1030-153'
         """
         # Основной паттерн: ищем "арт." и берём всё до открывающей скобки
-        # Включаем кириллические двойники (АВСЕКМНОРТХ) рядом с латиницей
-        _LAT_CYR = r'A-ZА-Я'  # Латиница + кириллица в character class
-        match = re.search(r'арт\.[\s\W]*([A-ZА-ЯЁАВСЕКМНОРТХ0-9][A-ZА-Яа-яЁё0-9\-]+?)(?:\s*[\(,]|\s+[А-Я])', str(nomenclature), re.IGNORECASE)
+        text = str(nomenclature)
+        match = _ARTICLE_RE.search(text)
         if match:
             article = match.group(1).strip()
             article = article.rstrip('-')
             return article
 
         # Запасной вариант: точка + артикул
-        match = re.search(r'\.[\s\W]*([A-ZА-ЯАВСЕКМНОРТХ]{1,4}[0-9\-]+[A-Za-z0-9\-]*)', str(nomenclature))
+        match = _ARTICLE_DOT_RE.search(text)
         if match:
             return match.group(1)
 
         # Последний шанс: ищем любой паттерн похожий на артикул
-        match = re.search(r'([A-ZА-ЯАВСЕКМНОРТХ]{1,2}[0-9]{2,}[A-Z]?[0-9\-]+[A-Z0-9]*)', str(nomenclature))
+        match = _ARTICLE_ANY_RE.search(text)
         return match.group(1) if match else None
 
+    @staticmethod
+    def _extract_articles(nomenclature: pd.Series) -> pd.Series:
+        """
+        Извлекает артикулы сразу для всей колонки номенклатуры
+
+        То же, что _extract_article построчно, но через Series.str.extract:
+        каждый паттерн прогоняется по колонке целиком, следующий - только
+        там, где предыдущие не нашли артикул. Где артикула нет - NaN.
+
+        Номенклатура в выгрузке повторяется для каждого размера и кода,
+        поэтому разбираются только уникальные строки.
+        """
+        text = nomenclature.astype(str)
+        unique = pd.Series(text.unique())
+
+        articles = unique.str.extract(_ARTICLE_RE, expand=False)
+        articles = articles.str.strip().str.rstrip('-')
+        for pattern in (_ARTICLE_DOT_RE, _ARTICLE_ANY_RE):
+            missing = articles.isna()
+            if not missing.any():
+                break
+            articles[missing] = unique[missing].str.extract(pattern, expand=False)
+
+        return text.map(dict(zip(unique, articles)))
+
     def _load(self):
         """Загружает данные из файла и строит индекс"""
         logger.info(f"Загрузка файла КМ: {self.file_path}")
 
         try:
-            df = pd.read_excel(self.file_path, header=0)
+            df = read_excel(self.file_path, header=0)
 
             # Ожидаемые колонки: Номенклатура, Размер, GTIN, КМ
             if len(df.columns) < 4:
@@ -104,8 +154,8 @@ class KMLoader:
             df.columns = ['Номенклатура', 'Размер', 'GTIN', 'КМ']
 
             # Извлекаем артикулы и нормализуем (кириллица → латиница, убираем суффиксы)
-            df['Артикул'] = df['Номенклатура'].apply(self._extract_article)
-            df['Артикул'] = df['Артикул'].apply(lambda x: self._normalize_article(x) if x else x)
+            df['Артикул'] = self._extract_articles(df['Номенклатура'])
+            df['Артикул'] = df['Артикул'].map(self._normalize_article, na_action='ignore')
 
             # Проверяем успешность извлечения
             failed = df['Артикул'].isna().sum()
@@ -113,16 +163,25 @@ class KMLoader:
                 logger.warning(f"Не удалось извлечь артикул для {failed} записей")
 
             # Строим индекс: (артикул, размер) -> [км1, км2, ...]
-            for _, row in df.iterrows():
-                article = row['Артикул']
-                size = row['Размер']
-                km = row['КМ']
-
-                if article and pd.notna(km):
-                    key = (article, int(size))
-                    if key not in self._index:
-                        self._index[key] = []
-                    self._index[key].append(str(km))
+            # Группировка делается в pandas; порядок кодов внутри группы - как в файле
+            valid = df[df['КМ'].notna() & df['Артикул'].notna() & (df['Артикул'] != '')]
+            # Артикулов немного относительно числа кодов - category группируется
+            # по целочисленным кодам категорий, а не по строкам
+            codes = pd.DataFrame({
+                'Артикул': valid['Артикул'].astype('category'),
+                'Размер': valid['Размер'].astype(int),
+                'КМ': valid['КМ'].astype(str),
+            })
+            self._index.update(
+                codes.groupby(['Артикул', 'Размер'], sort=False, observed=True)['КМ'].agg(list).to_dict()
+            )
+
+            # Индекс после загрузки не меняется - раскладываем по артикулам
+            # и считаем сводку один раз
+            for (article, size), km_list in self._index.items():
+                self._by_article.setdefault(article, {})[size] = km_list
+            self._articles = list(self._by_article)
+            self._total_codes = sum(len(codes) for codes in self._index.values())
 
             logger.info(f"Загружено {len(df)} записей, {len(self._index)} уникальных комбинаций артикул+размер")
 
@@ -134,7 +193,7 @@ class KMLoader:
             logger.error(f"Ошибка загрузки файла КМ: {e}")
             raise
 
-    def get_km_codes(self, article: str, sizes: List[int]) -> List[str]:
+    def get_km_codes(self, article: str, sizes: Sequence[int]) -> List[str]:
         """
         Получает все КМ коды для артикула по указанным размерам.
 
@@ -148,12 +207,10 @@ class KMLoader:
         # Нормализуем артикул — убираем суффиксы типа ' PRG'
         normalized_article = self._normalize_article(article)
 
-        result = []
-        for size in sizes:
-            key = (normalized_article, size)
-            if key in self._index:
-                result.extend(self._index[key])
-        return result
+        by_size = self._by_article.get(normalized_article)
+        if not by_size:
+            return []
+        return list(chain.from_iterable(by_size[size] for size in sizes if size in by_size))
 
     def get_km_codes_for_category(self, article: str, insole_category: str) -> List[str]:
         """
@@ -167,12 +224,12 @@ class KMLoader:
             Список КМ кодов
         """
         if "до 24см" in insole_category:
-            sizes = [35, 36, 37]
+            sizes = self._SIZES_SMALL
         elif "более 24см" in insole_category:
-            sizes = [38, 39, 40, 41]
+            sizes = self._SIZES_LARGE
         else:
             # Неизвестная категория — берём все размеры
-            sizes = [35, 36, 37, 38, 39, 40, 41]
+            sizes = self._SIZES_ALL
 
         return self.get_km_codes(article, sizes)
 
@@ -186,7 +243,7 @@ class KMLoader:
         Returns:
             Список всех КМ кодов для артикула
         """
-        return self.get_km_codes(article, [35, 36, 37, 38, 39, 40, 41])
+        return self.get_km_codes(article, self._SIZES_ALL)
 
     def get_km_codes_exact(self, article: str, qty_by_size: dict) -> List[str]:
         """
@@ -216,7 +273,8 @@ class KMLoader:
         for size, qty in sorted(qty_by_size.items()):
             key = (normalized_article, size)
 
-            if key not in self._index:
+            available_codes = self._index.get(key)
+            if available_codes is None:
                 # Нет кодов для этой комбинации артикул+размер
                 logger.warning(f"Нет КМ кодов для {normalized_article} размер {size}")
                 continue
@@ -225,7 +283,6 @@ class KMLoader:
             start_index = self._used_indices.get(key, 0)
 
             # Получаем нужное количество кодов
-            available_codes = self._index[key]
             codes_to_take = available_codes[start_index:start_index + qty]
 
             if len(codes_to_take) < qty:
@@ -245,9 +302,9 @@ class KMLoader:
     @property
     def articles(self) -> List[str]:
         """Возвращает список уникальных артикулов"""
-        return list(set(article for article, _ in self._index.keys()))
+        return self._articles
 
     @property
     def total_codes(self) -> int:
         """Возвращает общее количество КМ кодов"""
-        return sum(len(codes) for codes in self._index.values())
+        return self._total_codes
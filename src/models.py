@@ -1,11 +1,21 @@
 """
 Модели данных
 """
+from functools import cached_property, lru_cache
 from pydantic import BaseModel, Field
-from typing import Optional, List
+from typing import Optional, List, NamedTuple
 from decimal import Decimal
 
 
+# Размеры по категориям длины стельки во входном файле
+SIZES_LE24 = frozenset((35, 36, 37))
+SIZES_GT24 = frozenset((38, 39, 40, 41, 42))
+
+# Текст категории длины стельки в описании и в поиске КМ
+INSOLE_LE24 = "длина стельки до 24см"
+INSOLE_GT24 = "длина стельки более 24см"
+
+
 class ProductLine(BaseModel):
     """Одна строка товара из входного файла"""
     row_number: int
@@ -29,22 +39,23 @@ class ProductLine(BaseModel):
     # Количество по размерам
     qty_by_size: dict  # {35: 100, 36: 200, ...}
 
-    @property
+    # Количества по размерам после парсинга не меняются - суммы считаются один раз
+    @cached_property
     def total_pairs(self) -> int:
         """Общее количество пар"""
         return sum(self.qty_by_size.values())
 
-    @property
+    @cached_property
     def pairs_le24(self) -> int:
         """Пары ≤24см (размеры 35-37)"""
         return sum(qty for size, qty in self.qty_by_size.items()
-                   if size in [35, 36, 37])
+                   if size in SIZES_LE24)
 
-    @property
+    @cached_property
     def pairs_gt24(self) -> int:
         """Пары >24см (размеры 38+)"""
         return sum(qty for size, qty in self.qty_by_size.items()
-                   if size in [38, 39, 40, 41, 42])
+                   if size in SIZES_GT24)
 
 
 class ShipmentLine(BaseModel):
@@ -106,7 +117,7 @@ class ShipmentLine(BaseModel):
         Категория длины стельки
         Для нового формата: только размеры 36-37, все ≤24см
         """
-        return "длина стельки до 24см"
+        return INSOLE_LE24
 
 
 class OutputLine(BaseModel):
@@ -143,6 +154,48 @@ class OutputLine(BaseModel):
     qty_by_size: Optional[dict] = None      # {размер: количество пар}, например {35: 2, 36: 3}
 
 
+
+@lru_cache(maxsize=1024, typed=True)
+def to_decimal(value) -> Decimal:
+    """
+    Переводит значение ячейки в Decimal (через str - без двоичной погрешности float)
+
+    Строки парсеров создаются через model_construct без валидации pydantic,
+    поэтому NaN/Infinity отвергаются здесь, как их отвергало поле Decimal.
+
+    Цены и веса в файле повторяются из строки в строку, поэтому результат
+    кэшируется (Decimal неизменяем); typed=True - чтобы 1 и 1.0 давали
+    разные Decimal('1') и Decimal('1.0').
+    """
+    result = Decimal(str(value))
+    if not result.is_finite():
+        raise ValueError(f"Некорректное число: {value}")
+    return result
+
+
+class LineTotals(NamedTuple):
+    """Итоги по строкам выходных документов"""
+    quantity: int
+    amount: Decimal
+    net_weight: Decimal
+    gross_weight: Decimal
+
+
+def line_totals(lines: List[OutputLine]) -> LineTotals:
+    """
+    Считает итоги (количество, сумма, нетто, брутто) за один проход
+
+    Суммы остаются в Decimal: перевод в float64 ради векторизации
+    дал бы погрешность округления в денежных итогах.
+    """
+    qty = amount = net = gross = 0
+    for line in lines:
+        qty += line.quantity
+        amount += line.amount
+        net += line.net_weight
+        gross += line.gross_weight
+    return LineTotals(qty, amount, net, gross)
+
 class DocumentMetadata(BaseModel):
     """Метаданные документа"""
     invoice_number: str
@@ -3,8 +3,8 @@
 """
 import pandas as pd
 from typing import List, Tuple
-from decimal import Decimal
-from .models import ProductLine
+from .models import ProductLine, to_decimal
+from .io_utils import read_excel
 import logging
 
 logger = logging.getLogger(__name__)
@@ -21,26 +21,38 @@ class InputFileParser:
         """Читает и парсит входной файл"""
 
         # Читаем Excel
-        df = pd.read_excel(file_path, sheet_name=0)
+        df = read_excel(file_path, sheet_name=0)
 
         # Удаляем пустые строки и итоговые строки
         df = df[df[self.columns['article']].notna()]
         df = df[df[self.columns['article']] != '']
 
+        # Читаем колонки целиком - без Series на каждую строку (iterrows)
+        columns = self.columns
+        values = {key: df[col].tolist() for key, col in columns.items() if col in df.columns}
+        composition = values.get('composition')
+
+        # Колонки количества по размерам, которые есть в файле
+        size_columns = []
+        for size in [35, 36, 37, 38, 39, 40, 41, 42]:
+            key = f'qty_{size}'
+            if key in values:
+                size_columns.append((size, values[key]))
+
         products = []
 
-        for idx, row in df.iterrows():
+        for i, idx in enumerate(df.index.tolist()):
             try:
                 # Парсим код (формат: 6403911100/6403911800)
-                code_raw = str(row[self.columns['code']])
+                code_raw = str(values['code'][i])
                 hs_le24, hs_gt24 = self._parse_hs_code(code_raw)
 
                 # Собираем количество по размерам
                 qty_by_size = {}
-                for size in [35, 36, 37, 38, 39, 40, 41, 42]:
-                    col_name = self.columns.get(f'qty_{size}')
-                    if col_name and col_name in row and pd.notna(row[col_name]):
-                        qty = int(row[col_name])
+                for size, qty_values in size_columns:
+                    qty = qty_values[i]
+                    if pd.notna(qty):
+                        qty = int(qty)
                         if qty > 0:
                             qty_by_size[size] = qty
 
@@ -48,25 +60,25 @@ class InputFileParser:
                     logger.warning(f"Строка {idx + 2}: нет количества по размерам, пропускаем")
                     continue
 
-                product = ProductLine(
+                # Типы приведены явно - валидация pydantic не нужна
+                product = ProductLine.model_construct(
                     row_number=idx + 2,
-                    brand=str(row[self.columns['brand']]),
-                    article=str(row[self.columns['article']]),
+                    brand=str(values['brand'][i]),
+                    article=str(values['article'][i]),
                     code_raw=code_raw,
                     hs_code_le24=hs_le24,
                     hs_code_gt24=hs_gt24,
-                    name=str(row[self.columns['name']]),
-                    material=str(row[self.columns['material']]),
-                    color=str(row[self.columns['color']]),
-                    lining=str(row[self.columns['lining']]),
-                    sole=str(row[self.columns['sole']]),
-                    heel_height=str(row[self.columns['heel_height']]),
-                    composition=str(row[self.columns['composition']]) if pd.notna(
-                        row.get(self.columns['composition'])) else None,
-                    price=Decimal(str(row[self.columns['price']])),
-                    boxes=int(row[self.columns['boxes']]),
-                    net_weight_per_pair=Decimal(str(row[self.columns['net_weight_per_pair']])),
-                    gross_weight_per_box=Decimal(str(row[self.columns['gross_weight_per_box']])),
+                    name=str(values['name'][i]),
+                    material=str(values['material'][i]),
+                    color=str(values['color'][i]),
+                    lining=str(values['lining'][i]),
+                    sole=str(values['sole'][i]),
+                    heel_height=str(values['heel_height'][i]),
+                    composition=str(composition[i]) if composition is not None and pd.notna(composition[i]) else None,
+                    price=to_decimal(values['price'][i]),
+                    boxes=int(values['boxes'][i]),
+                    net_weight_per_pair=to_decimal(values['net_weight_per_pair'][i]),
+                    gross_weight_per_box=to_decimal(values['gross_weight_per_box'][i]),
                     qty_by_size=qty_by_size
                 )
 
@@ -1,9 +1,11 @@
 """
 Процессор данных - преобразование в строки для документов
 """
-from typing import List
+from typing import List, Optional
 from decimal import Decimal
-from .models import ProductLine, OutputLine
+from .models import ProductLine, OutputLine, SIZES_LE24, SIZES_GT24, INSOLE_LE24, INSOLE_GT24
+
+_DEC0 = Decimal('0')
 
 
 class DataProcessor:
@@ -23,6 +25,9 @@ class DataProcessor:
         output_lines = []
 
         for product in products:
+            # Поля товара, одинаковые для всех его строк (≤24см / >24см)
+            common = self._common_fields(product)
+
             # Проверяем, одинаковые ли коды ТН ВЭД
             codes_are_same = (product.hs_code_le24 == product.hs_code_gt24)
             
@@ -32,7 +37,8 @@ class DataProcessor:
                     output_lines.append(self._create_output_line(
                         product,
                         category="all",  # Все размеры вместе
-                        quantity=product.total_pairs
+                        quantity=product.total_pairs,
+                        common=common
                     ))
             else:
                 # Если коды разные - создаем ДВЕ строки (как раньше)
@@ -42,7 +48,8 @@ class DataProcessor:
                     output_lines.append(self._create_output_line(
                         product,
                         category="le24",
-                        quantity=product.pairs_le24
+                        quantity=product.pairs_le24,
+                        common=common
                     ))
 
                 # Строка для категории >24см
@@ -50,18 +57,43 @@ class DataProcessor:
                     output_lines.append(self._create_output_line(
                         product,
                         category="gt24",
-                        quantity=product.pairs_gt24
+                        quantity=product.pairs_gt24,
+                        common=common
                     ))
 
         return output_lines
 
+    @staticmethod
+    def _common_fields(product: ProductLine) -> dict:
+        """Поля выходной строки, которые не зависят от категории размеров"""
+        return dict(
+            brand=product.brand,
+            article=product.article,
+            description=product.name,
+            color=product.color,
+            material=product.material,
+            lining=product.lining,
+            sole=product.sole,
+            heel_height=product.heel_height,
+            original_boxes=product.boxes,  # ← ДОБАВЛЕНО: Сохраняем исходное количество коробок
+            price=product.price,
+        )
+
     def _create_output_line(
             self,
             product: ProductLine,
             category: str,
-            quantity: int
+            quantity: int,
+            common: Optional[dict] = None
     ) -> OutputLine:
-        """Создает строку для документа"""
+        """
+        Создает строку для документа
+
+        Args:
+            common: общие поля товара (_common_fields); если не переданы, собираются здесь
+        """
+        if common is None:
+            common = self._common_fields(product)
 
         # Определяем HS код и описание категории
         # А также фильтруем qty_by_size для категории
@@ -69,14 +101,14 @@ class DataProcessor:
 
         if category == "le24":
             hs_code = product.hs_code_le24
-            insole_text = "длина стельки до 24см"
+            insole_text = INSOLE_LE24
             # Только размеры ≤24см (35-37)
-            qty_by_size = {size: qty for size, qty in product.qty_by_size.items() if size in [35, 36, 37]}
+            qty_by_size = {size: qty for size, qty in product.qty_by_size.items() if size in SIZES_LE24}
         elif category == "gt24":
             hs_code = product.hs_code_gt24
-            insole_text = "длина стельки более 24см"
+            insole_text = INSOLE_GT24
             # Только размеры >24см (38+)
-            qty_by_size = {size: qty for size, qty in product.qty_by_size.items() if size in [38, 39, 40, 41, 42]}
+            qty_by_size = {size: qty for size, qty in product.qty_by_size.items() if size in SIZES_GT24}
         else:  # category == "all"
             # Если код один для всех размеров - используем его
             hs_code = product.hs_code_le24  # Они одинаковые, можно взять любой
@@ -100,7 +132,7 @@ class DataProcessor:
         if product.total_pairs > 0:
             gross_weight = (product.gross_weight_per_box * product.boxes * quantity) / product.total_pairs
         else:
-            gross_weight = Decimal(0)
+            gross_weight = _DEC0
 
         # Количество коробок берем из исходного файла БЕЗ пересчета
         # Для разделенных строк (le24/gt24) boxes отображается только в первой строке
@@ -109,23 +141,15 @@ class DataProcessor:
         # Сумма
         amount = product.price * quantity
 
-        return OutputLine(
-            brand=product.brand,
+        # Все значения уже нужных типов (str/int/Decimal) - без валидации pydantic
+        return OutputLine.model_construct(
+            **common,
             hs_code=hs_code,
-            article=product.article,
-            description=product.name,
-            color=product.color,
-            material=product.material,
-            lining=product.lining,
-            sole=product.sole,
-            heel_height=product.heel_height,
             insole_category=insole_text,
             quantity=quantity,
             net_weight=round(net_weight, 3),
             gross_weight=round(gross_weight, 3),
             boxes=boxes if category in ["le24", "all"] else 0,  # Коробки указываем в первой строке или в единственной
-            original_boxes=product.boxes,  # ← ДОБАВЛЕНО: Сохраняем исходное количество коробок
-            price=product.price,
             amount=round(amount, 2),
             kiz_codes=[],
             qty_by_size=qty_by_size  # ← ДОБАВЛЕНО: Сохраняем информацию о размерах
@@ -2,14 +2,30 @@
 Парсер для файлов формата "Перечень отправки грузы"
 """
 import pandas as pd
-from typing import List, Optional, Tuple
-from decimal import Decimal
-from .models import ShipmentLine
+from typing import List, NamedTuple, Optional, Tuple
+from .models import ShipmentLine, to_decimal
+from .io_utils import read_excel
 import logging
 
 logger = logging.getLogger(__name__)
 
 
+class BoxGroup(NamedTuple):
+    """Группа строк с одной объединённой ячейкой КОРОБОК"""
+    id: int
+    start_row: int
+    end_row: int
+    box_count: int
+
+
+# Текстовые колонки, которые всегда приводятся к str и обрезаются
+# (артикул - отдельно: пустой артикул отсекает строку до приведения)
+_TEXT_COLUMNS = [
+    'марка', 'таможенный код', 'вид обуви', 'материал верх', 'цвет',
+    'материал подкладка', 'материал подошва', 'Высота каблука', 'с/без перфорации',
+]
+
+
 class ShipmentParser:
     """
     Парсер для нового формата входного файла
@@ -27,7 +43,8 @@ class ShipmentParser:
         """
         self.file_path = file_path
         self.df = None
-        self.box_groups = []  # Список групп коробок
+        self.box_groups: List[BoxGroup] = []  # Список групп коробок
+        self._row_groups = []  # (group_id, box_count) по индексу строки
 
     def parse(self) -> List[ShipmentLine]:
         """
@@ -39,10 +56,17 @@ class ShipmentParser:
         logger.info(f"Начинаю парсинг файла: {self.file_path}")
 
         # Читаем файл
-        self.df = pd.read_excel(self.file_path)
+        self.df = read_excel(self.file_path)
 
         logger.info(f"Прочитано строк: {len(self.df)}")
 
+        # str(...).strip() для текстовых колонок - сразу по всей колонке;
+        # значения повторяются из строки в строку, category хранит каждое один раз
+        # и строки ShipmentLine ссылаются на общие объекты str
+        for col in _TEXT_COLUMNS:
+            if col in self.df.columns:
+                self.df[col] = self.df[col].astype(str).str.strip().astype('category')
+
         # Определяем группы коробок (объединенные ячейки в столбце P)
         self._detect_box_groups()
 
@@ -70,42 +94,42 @@ class ShipmentParser:
         - Если значение != NaN → начало новой группы
         - Все последующие NaN до следующего значения → та же группа
 
+        Начала групп находятся маской notna по всей колонке, цикл идёт
+        только по группам. Для каждой строки запоминается
+        (group_id, box_count) в self._row_groups, чтобы _get_box_group
+        не перебирал группы.
+
         Результат сохраняется в self.box_groups:
         [
-            {'start_row': 0, 'end_row': 2, 'box_count': 1},
-            {'start_row': 3, 'end_row': 5, 'box_count': 2},
+            BoxGroup(id=0, start_row=0, end_row=2, box_count=1),
+            BoxGroup(id=1, start_row=3, end_row=5, box_count=2),
             ...
         ]
         """
         box_col = 'КОРОБОК'  # Столбец P
 
+        # Повторный parse() не должен дублировать группы
+        self.box_groups = []
+        self._row_groups = []
+
         if box_col not in self.df.columns:
             logger.warning(f"Столбец '{box_col}' не найден в файле")
             return
 
-        current_group = None
-        group_id = 0
-
-        for idx, value in enumerate(self.df[box_col]):
-            if pd.notna(value):  # Начало новой группы
-                # Закрываем предыдущую группу
-                if current_group is not None:
-                    current_group['end_row'] = idx - 1
-                    self.box_groups.append(current_group)
-
-                # Начинаем новую группу
-                current_group = {
-                    'id': group_id,
-                    'start_row': idx,
-                    'end_row': idx,  # Будет обновлено
-                    'box_count': int(value)
-                }
-                group_id += 1
-
-        # Закрываем последнюю группу
-        if current_group is not None:
-            current_group['end_row'] = len(self.df) - 1
-            self.box_groups.append(current_group)
+        # Начала групп - непустые ячейки; группа тянется до следующего начала
+        values = self.df[box_col].reset_index(drop=True)
+        filled = values.notna()
+        starts = values.index[filled].tolist()
+        box_counts = values[filled].tolist()
+        ends = [start - 1 for start in starts[1:]] + [len(values) - 1]
+
+        # Строки до первой группы ни к чему не относятся
+        self._row_groups = [(None, None)] * len(values)
+
+        for group_id, (start, end, value) in enumerate(zip(starts, ends, box_counts)):
+            group = BoxGroup(group_id, start, end, int(value))
+            self.box_groups.append(group)
+            self._row_groups[start:end + 1] = [(group_id, group.box_count)] * (end - start + 1)
 
     def _get_box_group(self, row_idx: int) -> Tuple[Optional[int], Optional[int]]:
         """
@@ -117,9 +141,9 @@ class ShipmentParser:
         Returns:
             (group_id, box_count) или (None, None)
         """
-        for group in self.box_groups:
-            if group['start_row'] <= row_idx <= group['end_row']:
-                return group['id'], group['box_count']
+        # Группа каждой строки уже известна из _detect_box_groups
+        if 0 <= row_idx < len(self._row_groups):
+            return self._row_groups[row_idx]
         return None, None
 
     def _parse_row(self, idx: int, row: pd.Series) -> Optional[ShipmentLine]:
@@ -143,30 +167,30 @@ class ShipmentParser:
         # Парсим тип полупары
         halfpair_raw = str(row.get(' левый полупарок/ правый полупарок', '')).strip()
 
-        # Создаем объект
-        line = ShipmentLine(
+        # Создаем объект (типы приведены явно - без валидации pydantic)
+        line = ShipmentLine.model_construct(
             row_number=idx + 2,  # Excel нумерация с 1, заголовок = 1
             article=str(row['артикул']).strip(),
-            brand=str(row['марка']).strip(),
-            hs_code=str(row['таможенный код']).strip(),
-            shoe_type=str(row['вид обуви']).strip(),
-            material=str(row['материал верх']).strip(),
-            color=str(row['цвет']).strip(),
-            lining=str(row['материал подкладка']).strip(),
-            sole=str(row['материал подошва']).strip(),
-            heel_height=str(row['Высота каблука']).strip(),
+            brand=row['марка'],
+            hs_code=row['таможенный код'],
+            shoe_type=row['вид обуви'],
+            material=row['материал верх'],
+            color=row['цвет'],
+            lining=row['материал подкладка'],
+            sole=row['материал подошва'],
+            heel_height=row['Высота каблука'],
             shaft_height=str(row['высота гленище']).strip() if pd.notna(row.get('высота гленище', '')) else '',
             composition=str(row['процентный состав']).strip() if pd.notna(row.get('процентный состав')) else None,
-            perforation=str(row['с/без перфорации']).strip(),
+            perforation=row['с/без перфорации'],
             size=int(row['размер']),
             halfpair_type=halfpair_raw,
             halfpairs_loaded=int(row['полупар  ЗАГРУЖЕНЫ']) if pd.notna(row.get('полупар  ЗАГРУЖЕНЫ')) else 1,
             box_group=box_group,
             boxes_in_group=boxes_in_group,
-            net_weight_per_unit=Decimal(str(row['вес нетто на штук'])),
-            gross_weight_per_box=Decimal(str(row['вес брутто на коробку'])) if pd.notna(row.get('вес брутто на коробку')) else None,
-            box_volume=Decimal(str(row['ОБЬЁМ КОРОБКИ'])) if pd.notna(row.get('ОБЬЁМ КОРОБКИ')) else None,
-            price=Decimal(str(row['цена']))
+            net_weight_per_unit=to_decimal(row['вес нетто на штук']),
+            gross_weight_per_box=to_decimal(row['вес брутто на коробку']) if pd.notna(row.get('вес брутто на коробку')) else None,
+            box_volume=to_decimal(row['ОБЬЁМ КОРОБКИ']) if pd.notna(row.get('ОБЬЁМ КОРОБКИ')) else None,
+            price=to_decimal(row['цена'])
         )
 
         return line
@@ -1,13 +1,40 @@
 """
 Процессор для обработки данных формата "Перечень отправки грузы"
 """
+from functools import lru_cache
 from typing import List
 from decimal import Decimal
-from .models import ShipmentLine, OutputLine
+from .models import ShipmentLine, OutputLine, INSOLE_LE24
 import logging
 
 logger = logging.getLogger(__name__)
 
+_DEC0 = Decimal('0')
+
+
+@lru_cache(maxsize=4096)
+def _describe(shoe_type, material, color, lining, sole, heel_height,
+              shaft_height, halfpair_type, composition) -> str:
+    """
+    Описание товара по его характеристикам (см. ShipmentProcessor._build_description)
+
+    Строки одного товара разных размеров дают одинаковое описание -
+    кэш возвращает один и тот же объект str вместо новой строки на каждую.
+    """
+    # Обязательная часть одной f-строкой; голенище и состав - только если есть
+    description = (
+        f"{shoe_type}, верх:{material}, цвет:{color}, "
+        f"подкладка:{lining}, подошва:{sole}, каблук:{heel_height}"
+    )
+    if shaft_height:
+        description += f", голенище:{shaft_height}"
+    # Категория стельки в этом формате всегда одна (все размеры ≤24см)
+    description += f", {halfpair_type}, {INSOLE_LE24}"
+    if composition:
+        description += f", состав:{composition}"
+
+    return description
+
 
 class ShipmentProcessor:
     """
@@ -40,11 +67,8 @@ class ShipmentProcessor:
         """
         logger.info(f"Начинаю обработку {len(lines)} строк")
 
-        output_lines = []
-
-        for line in lines:
-            output = self._convert_to_output(line)
-            output_lines.append(output)
+        convert = self._convert_to_output  # Метод один раз, а не поиск атрибута на каждой строке
+        output_lines = [convert(line) for line in lines]
 
         logger.info(f"Обработано строк: {len(output_lines)}")
         return output_lines
@@ -68,8 +92,12 @@ class ShipmentProcessor:
         # Создаем расширенное описание
         description = self._build_description(line)
 
-        # Создаем выходную строку
-        output = OutputLine(
+        # Пустые брутто и коробки -> 0 (коробки нужны дважды: boxes и original_boxes)
+        gross_weight = line.gross_weight_per_box or _DEC0
+        boxes = line.boxes_in_group or 0
+
+        # Создаем выходную строку (поля ShipmentLine уже нужных типов - без валидации)
+        output = OutputLine.model_construct(
             brand=line.brand,
             hs_code=line.hs_code,
             article=line.article,
@@ -79,12 +107,12 @@ class ShipmentProcessor:
             lining=line.lining,
             sole=line.sole,
             heel_height=line.heel_height,
-            insole_category=line.insole_category,  # Всегда "до 24см"
+            insole_category=INSOLE_LE24,  # Всегда "до 24см"
             quantity=line.halfpairs_loaded,
             net_weight=line.total_net_weight,
-            gross_weight=line.gross_weight_per_box if line.gross_weight_per_box else Decimal('0'),
-            boxes=line.boxes_in_group if line.boxes_in_group else 0,
-            original_boxes=line.boxes_in_group if line.boxes_in_group else 0,
+            gross_weight=gross_weight,
+            boxes=boxes,
+            original_boxes=boxes,
             price=line.price,
             amount=line.total_amount,
 
@@ -116,38 +144,8 @@ class ShipmentProcessor:
         Returns:
             str: описание товара
         """
-        parts = []
-
-        # Вид обуви
-        parts.append(line.shoe_type)
-
-        # Материал верха
-        parts.append(f"верх:{line.material}")
-
-        # Цвет
-        parts.append(f"цвет:{line.color}")
-
-        # Подкладка
-        parts.append(f"подкладка:{line.lining}")
-
-        # Подошва
-        parts.append(f"подошва:{line.sole}")
-
-        # Высота каблука
-        parts.append(f"каблук:{line.heel_height}")
-
-        # Высота голенища (если есть)
-        if line.shaft_height:
-            parts.append(f"голенище:{line.shaft_height}")
-
-        # Тип полупары
-        parts.append(line.halfpair_type)
-
-        # Категория стельки (всегда ≤24см)
-        parts.append(line.insole_category)
-
-        # Процентный состав (если есть)
-        if line.composition:
-            parts.append(f"состав:{line.composition}")
-
-        return ", ".join(parts)
+        return _describe(
+            line.shoe_type, line.material, line.color, line.lining, line.sole,
+            line.heel_height, line.shaft_height, line.halfpair_type,
+            line.composition,
+        )
@@ -0,0 +1,20 @@
+"""
+Списки Excel файлов для вкладок GUI.
+"""
+import os
+
+
+def list_xlsx(dir_path) -> list:
+    """
+    .xlsx файлы папки, свежие сверху (без временных ~$ файлов Excel).
+
+    Возвращает DirEntry: stat() кэшируется в записи, поэтому сортировка
+    и строки списка не делают повторных системных вызовов. Path строится
+    только для выбранного файла.
+    """
+    entries = [
+        e for e in os.scandir(dir_path)
+        if e.name.lower().endswith(".xlsx") and not e.name.startswith("~") and e.is_file()
+    ]
+    entries.sort(key=lambda e: e.stat().st_mtime, reverse=True)
+    return entries
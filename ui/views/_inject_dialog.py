@@ -9,6 +9,8 @@ from datetime import datetime
 import customtkinter as ctk
 from tkinter import filedialog
 
+from ui.views._files import list_xlsx
+
 
 
 class InjectKIZDialog(ctk.CTkToplevel):
@@ -74,16 +76,13 @@ class InjectKIZDialog(ctk.CTkToplevel):
     # ------------------------------------------------------------------
     def _pick_output(self):
         out_dir = Path("output")
-        files = sorted(
-            [f for f in out_dir.glob("*.xlsx") if not f.name.startswith("~")],
-            key=lambda f: f.stat().st_mtime, reverse=True,
-        ) if out_dir.exists() else []
+        files = list_xlsx(out_dir) if out_dir.exists() else []
 
         if not files:
             self._target_lbl.configure(text="Нет файлов в output/", text_color="orange")
             return
         if len(files) == 1:
-            self._set_target(files[0]); return
+            self._set_target(Path(files[0].path)); return
 
         win = ctk.CTkToplevel(self)
         win.title("Выберите файл")
@@ -91,14 +90,16 @@ class InjectKIZDialog(ctk.CTkToplevel):
         win.grab_set()
         scroll = ctk.CTkScrollableFrame(win)
         scroll.pack(fill="both", expand=True, padx=12, pady=12)
+        fromtimestamp = datetime.fromtimestamp
+        date_fmt = "%d.%m.%Y %H:%M"
         for f in files:
-            mtime = datetime.fromtimestamp(f.stat().st_mtime).strftime("%d.%m.%Y %H:%M")
+            mtime = fromtimestamp(f.stat().st_mtime).strftime(date_fmt)
             row = ctk.CTkFrame(scroll, corner_radius=6, cursor="hand2")
             row.pack(fill="x", pady=2)
             ctk.CTkLabel(row, text=f.name, font=self._body_font, anchor="w").pack(side="left", padx=8, pady=6)
             ctk.CTkLabel(row, text=mtime, font=self._small_font, text_color="gray55").pack(side="right", padx=8)
             for w in (row, *row.winfo_children()):
-                w.bind("<Button-1>", lambda e, file=f, w=win: (self._set_target(file), w.destroy()))
+                w.bind("<Button-1>", lambda e, file=f, w=win: (self._set_target(Path(file.path)), w.destroy()))
 
     def _pick_dialog(self):
         path = filedialog.askopenfilename(
@@ -115,10 +116,7 @@ class InjectKIZDialog(ctk.CTkToplevel):
 
     def _refresh_km_list(self):
         km_dir = Path("выгрузка честный знак")
-        files = sorted(
-            [f for f in km_dir.glob("*.xlsx") if not f.name.startswith("~")],
-            key=lambda f: f.stat().st_mtime, reverse=True,
-        ) if km_dir.exists() else []
+        files = [Path(e.path) for e in list_xlsx(km_dir)] if km_dir.exists() else []
         if files:
             self._km_files_map = {f.name: f for f in files}
             self._km_dropdown.configure(values=[f.name for f in files])
@@ -11,6 +11,8 @@ import yaml
 import customtkinter as ctk
 from tkinter import filedialog
 
+from ui.views._files import list_xlsx
+
 logger = logging.getLogger(__name__)
 
 
@@ -141,9 +143,10 @@ class GenerationView(ctk.CTkFrame):
         grid.columnconfigure(3, weight=1)
 
         ctk.CTkLabel(grid, text="Номер инвойса:", font=self._body_font).grid(row=0, column=0, sticky="w", padx=(0, 8), pady=4)
-        self._invoice_entry = ctk.CTkEntry(grid, font=self._body_font, placeholder_text=datetime.now().strftime("%Y%m%d01"))
+        default_invoice = datetime.now().strftime("%Y%m%d01")
+        self._invoice_entry = ctk.CTkEntry(grid, font=self._body_font, placeholder_text=default_invoice)
         self._invoice_entry.grid(row=0, column=1, sticky="ew", padx=(0, 20), pady=4)
-        self._invoice_entry.insert(0, datetime.now().strftime("%Y%m%d01"))
+        self._invoice_entry.insert(0, default_invoice)
 
         ctk.CTkLabel(grid, text="Контейнер:", font=self._body_font).grid(row=0, column=2, sticky="w", padx=(0, 8), pady=4)
         self._container_entry = ctk.CTkEntry(grid, font=self._body_font, placeholder_text="TCKU1234567")
@@ -336,17 +339,14 @@ class GenerationView(ctk.CTkFrame):
             self._file_lbl.configure(text="Папка input/ не найдена", text_color="red")
             return
 
-        files = sorted(
-            [f for f in input_dir.glob("*.xlsx") if not f.name.startswith("~")],
-            key=lambda f: f.stat().st_mtime, reverse=True,
-        )
+        files = list_xlsx(input_dir)
         if not files:
             self._file_lbl.configure(text="Нет Excel файлов в input/", text_color="orange")
             return
 
         # Если файл один — берём сразу
         if len(files) == 1:
-            self._set_input_file(files[0])
+            self._set_input_file(Path(files[0].path))
             return
 
         # Иначе — диалог с кратким списком
@@ -360,16 +360,19 @@ class GenerationView(ctk.CTkFrame):
         listbox = ctk.CTkScrollableFrame(win)
         listbox.pack(fill="both", expand=True, padx=16, pady=4)
 
+        fromtimestamp = datetime.fromtimestamp
+        date_fmt = "%d.%m.%Y %H:%M"
         for f in files:
-            size_kb = f.stat().st_size / 1024
-            mtime   = datetime.fromtimestamp(f.stat().st_mtime).strftime("%d.%m.%Y %H:%M")
+            st      = f.stat()
+            size_kb = st.st_size / 1024
+            mtime   = fromtimestamp(st.st_mtime).strftime(date_fmt)
             row = ctk.CTkFrame(listbox, corner_radius=6, cursor="hand2")
             row.pack(fill="x", pady=2)
             ctk.CTkLabel(row, text=f.name, font=self._body_font, anchor="w").pack(side="left", padx=10, pady=6)
             ctk.CTkLabel(row, text=f"{size_kb:.0f} KB  {mtime}", font=self._small_font, text_color="gray55").pack(side="right", padx=10)
-            row.bind("<Button-1>", lambda e, file=f, w=win: (self._set_input_file(file), w.destroy()))
+            row.bind("<Button-1>", lambda e, file=f, w=win: (self._set_input_file(Path(file.path)), w.destroy()))
             for child in row.winfo_children():
-                child.bind("<Button-1>", lambda e, file=f, w=win: (self._set_input_file(file), w.destroy()))
+                child.bind("<Button-1>", lambda e, file=f, w=win: (self._set_input_file(Path(file.path)), w.destroy()))
 
     def _pick_file_dialog(self):
         path = filedialog.askopenfilename(
@@ -382,8 +385,9 @@ class GenerationView(ctk.CTkFrame):
 
     def _set_input_file(self, f: Path):
         self._input_file = f
-        size_kb = f.stat().st_size / 1024
-        mtime   = datetime.fromtimestamp(f.stat().st_mtime).strftime("%d.%m.%Y")
+        st      = f.stat()
+        size_kb = st.st_size / 1024
+        mtime   = datetime.fromtimestamp(st.st_mtime).strftime("%d.%m.%Y")
         self._file_lbl.configure(
             text=f"✅  {f.name}  ({size_kb:.0f} KB, {mtime})",
             text_color=("gray20", "gray85"),
@@ -411,10 +415,7 @@ class GenerationView(ctk.CTkFrame):
         km_dir = Path("выгрузка честный знак")
         files = []
         if km_dir.exists():
-            files = sorted(
-                [f for f in km_dir.glob("*.xlsx") if not f.name.startswith("~")],
-                key=lambda f: f.stat().st_mtime, reverse=True,
-            )
+            files = [Path(e.path) for e in list_xlsx(km_dir)]
         if not hasattr(self, "_km_files_map"):
             self._km_files_map = {}
         if files:
@@ -518,11 +519,10 @@ class GenerationView(ctk.CTkFrame):
         from src.generators.invoice       import InvoiceGenerator
         from src.generators.specification import SpecificationGenerator
         from src.generators.packing_list  import PackingListGenerator
-        from src.models    import DocumentMetadata
+        from src.generators               import build_row_plan, generate_all
+        from src.models    import DocumentMetadata, line_totals
         from src.km_loader import KMLoader
-        import tempfile, os
-        from openpyxl import Workbook, load_workbook
-        from copy import copy
+        from openpyxl import Workbook
 
         def log(msg): self._log_queue.put(("msg", msg))
         def err(msg): self._log_queue.put(("err", msg))
@@ -568,7 +568,8 @@ class GenerationView(ctk.CTkFrame):
                 log(f"✅  КМ: {count} кодов в {enriched} строках")
 
             # 3. Метаданные
-            date     = datetime.now().strftime("%d.%m.%Y")
+            now      = datetime.now()
+            date     = now.strftime("%d.%m.%Y")
             metadata = DocumentMetadata(
                 invoice_number   = invoice_number,
                 date             = date,
@@ -589,62 +590,37 @@ class GenerationView(ctk.CTkFrame):
             # 4. Генерация
             output_path = Path("output")
             output_path.mkdir(exist_ok=True)
-            base = f"Shusteri_{invoice_number}_{datetime.now().strftime('%Y%m%d')}"
+            base = f"Shusteri_{invoice_number}_{now.strftime('%Y%m%d')}"
 
-            log("📄  Генерация Invoice...")
             if output_fmt == "1":
+                log("📄  Генерация Invoice, Specification, Packing List...")
                 inv_path     = output_path / f"{base}_Invoice.xlsx"
                 spec_path    = output_path / f"{base}_Specification.xlsx"
                 packing_path = output_path / f"{base}_PackingList.xlsx"
 
-                InvoiceGenerator(config, preset, mode=mode).generate(output_lines, metadata, str(inv_path))
-                log("📄  Генерация Specification...")
-                SpecificationGenerator(config, preset, mode=mode).generate(output_lines, metadata, str(spec_path))
-                log("📄  Генерация Packing List...")
-                PackingListGenerator(config, preset, mode=mode).generate(output_lines, metadata, str(packing_path))
+                # Документы независимы - сохраняем параллельно
+                generate_all([
+                    (InvoiceGenerator(config, preset, mode=mode), inv_path),
+                    (SpecificationGenerator(config, preset, mode=mode), spec_path),
+                    (PackingListGenerator(config, preset, mode=mode), packing_path),
+                ], output_lines, metadata)
 
                 files = [inv_path, spec_path, packing_path]
             else:
                 log("📄  Сборка единого файла (3 листа)...")
                 combined = output_path / f"{base}_All_Documents.xlsx"
-                with tempfile.TemporaryDirectory(ignore_cleanup_errors=True) as tmp:
-                    ti = os.path.join(tmp, "inv.xlsx")
-                    ts = os.path.join(tmp, "spec.xlsx")
-                    tp = os.path.join(tmp, "pack.xlsx")
-                    InvoiceGenerator(config, preset, mode=mode).generate(output_lines, metadata, ti)
-                    SpecificationGenerator(config, preset, mode=mode).generate(output_lines, metadata, ts)
-                    PackingListGenerator(config, preset, mode=mode).generate(output_lines, metadata, tp)
-
-                    wb_out = Workbook()
-                    wb_out.remove(wb_out.active)
-                    for sheet_name, tmp_path in [("Invoice", ti), ("Specification", ts), ("Packing List", tp)]:
-                        wb_src = load_workbook(tmp_path)
-                        ws_src = wb_src.active
-                        ws_dst = wb_out.create_sheet(sheet_name)
-                        for col in ws_src.column_dimensions:
-                            ws_dst.column_dimensions[col].width = ws_src.column_dimensions[col].width
-                        for row_dim in ws_src.row_dimensions:
-                            ws_dst.row_dimensions[row_dim].height = ws_src.row_dimensions[row_dim].height
-                        for row in ws_src.iter_rows():
-                            for cell in row:
-                                tc = ws_dst[cell.coordinate]
-                                tc.value = cell.value
-                                if cell.has_style:
-                                    tc.font = copy(cell.font); tc.border = copy(cell.border)
-                                    tc.fill = copy(cell.fill); tc.alignment = copy(cell.alignment)
-                                    tc.number_format = copy(cell.number_format)
-                        for mr in ws_src.merged_cells.ranges:
-                            ws_dst.merge_cells(str(mr))
-                        wb_src.close()
-                    wb_out.save(str(combined))
-                    wb_out.close()
+                wb_out = Workbook()
+                wb_out.remove(wb_out.active)
+                plan = build_row_plan(output_lines)
+                for gen_cls in (InvoiceGenerator, SpecificationGenerator, PackingListGenerator):
+                    gen = gen_cls(config, preset, mode=mode)
+                    gen.populate_sheet(wb_out.create_sheet(gen.sheet_name), output_lines, metadata, plan)
+                wb_out.save(str(combined))
+                wb_out.close()
                 files = [combined]
 
             # Статистика
-            total_qty    = sum(l.quantity    for l in output_lines)
-            total_amount = sum(l.amount      for l in output_lines)
-            total_net    = sum(l.net_weight  for l in output_lines)
-            total_gross  = sum(l.gross_weight for l in output_lines)
+            total_qty, total_amount, total_net, total_gross = line_totals(output_lines)
 
             log("")
             log(f"✅  Готово! Создано файлов: {len(files)}")
@@ -8,6 +8,7 @@ from datetime import datetime
 
 import customtkinter as ctk
 
+from ui.views._files import list_xlsx
 
 
 class HistoryView(ctk.CTkFrame):
@@ -45,10 +46,7 @@ class HistoryView(ctk.CTkFrame):
             ctk.CTkLabel(self._scroll, text="Папка output/ не найдена", font=self._body_font, text_color="gray55").pack(pady=20)
             return
 
-        files = sorted(
-            [f for f in out_dir.glob("*.xlsx") if not f.name.startswith("~")],
-            key=lambda f: f.stat().st_mtime, reverse=True,
-        )
+        files = list_xlsx(out_dir)
         if not files:
             ctk.CTkLabel(self._scroll, text="Нет сгенерированных файлов", font=self._body_font, text_color="gray55").pack(pady=20)
             return
@@ -56,12 +54,14 @@ class HistoryView(ctk.CTkFrame):
         for f in files:
             self._add_row(f)
 
-    def _add_row(self, f: Path):
+    def _add_row(self, entry):
         row = ctk.CTkFrame(self._scroll, corner_radius=6)
         row.pack(fill="x", pady=2)
 
-        mtime   = datetime.fromtimestamp(f.stat().st_mtime).strftime("%d.%m.%Y %H:%M")
-        size_kb = f.stat().st_size / 1024
+        f       = Path(entry.path)
+        st      = entry.stat()
+        mtime   = datetime.fromtimestamp(st.st_mtime).strftime("%d.%m.%Y %H:%M")
+        size_kb = st.st_size / 1024
 
         ctk.CTkLabel(row, text=mtime, font=self._small_font, text_color="gray55", width=150, anchor="w").pack(side="left", padx=8, pady=6)
         ctk.CTkLabel(row, text=f.name, font=self._body_font, anchor="w").pack(side="left", padx=4, pady=6, expand=True, fill="x")